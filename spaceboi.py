@@ -4,6 +4,19 @@ import os
 import time
 import hashlib
 import json
+import re
+import bisect
+import functools
+import socket
+import threading
+import csv
+import codecs
+import mmap
+import tempfile
+import heapq
+import subprocess
+import urllib.parse
+import xml.etree.ElementTree as ET
 import requests
 from io import BytesIO
 import concurrent.futures
@@ -13,10 +26,10 @@ import platform
 import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QTableWidget, QTableWidgetItem,
-    QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLineEdit, QLabel, QListWidget, QAbstractItemView, QListWidgetItem, QCheckBox, QSizePolicy, QHeaderView, QMenu, QAction
+    QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLineEdit, QLabel, QListView, QComboBox, QAbstractItemView, QCheckBox, QSizePolicy, QHeaderView, QMenu, QAction
 )
-from PyQt5.QtCore import ( Qt, QRunnable, QThreadPool, pyqtSlot, pyqtSignal, QObject)
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import ( Qt, QRunnable, QThreadPool, pyqtSlot, pyqtSignal, QObject, QAbstractListModel, QSortFilterProxyModel, QModelIndex)
+from PyQt5.QtGui import QIcon, QColor, QFont
 
 from PyQt5.QtCore import QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
@@ -25,12 +38,23 @@ import matplotlib.pyplot as plt
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import pytz
 from mpl_toolkits.basemap import Basemap
 import icalendar
-from skyfield.api import Topos, load, EarthSatellite
-
-def calcPasses(satellite, startTime, hours, topo, minAltitude=0):
+from skyfield.api import Topos, load, Loader, EarthSatellite
+from skyfield.framelib import itrs
+from skyfield.iokit import parse_tle_file
+from sgp4 import exporter
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, ephemeris store builds are not serialized there
+    fcntl = None
+
+def calcPasses(satellite, startTime, hours, topo, minAltitude=0, eph=None, visibleOnly=False, horizonMask=None, prefilter=True):
     ts = load.timescale()
     endTime = startTime + timedelta(hours=hours)
     
@@ -38,10 +62,21 @@ def calcPasses(satellite, startTime, hours, topo, minAltitude=0):
     t1 = startTime + timedelta(hours=hours)
     
     difference = satellite - topo
-    events = satellite.find_events(topo, t0, t1, altitude_degrees=0)
+    orbit = classifyOrbit(satellite, topo, minAltitude, t0) if prefilter else ORBIT_SEARCH
+
+    if orbit == ORBIT_UNREACHABLE:
+        print(f"{satellite.name} never reaches {minAltitude} degrees here, skipped")
+        return []
+
+    if orbit == ORBIT_FIXED:
+        # No event search needed, handled like the all culmination case below
+        events = (t0, np.array([1]))
+    else:
+        events = satellite.find_events(topo, t0, t1, altitude_degrees=0)
 
-    # print number of 1s in events[1]
-    setCount =  np.count_nonzero(events[1] == 2)
+        if satellite.model.no_kozai * 1440 / (2 * math.pi) < HORIZON_CHECK_REVS:
+            # The timescale of the window is shared by the whole search
+            events = addMissedCrossings(events, horizonCrossings(difference, t0, t1, t0.ts), t0.ts)
 
     # Print the events ( timearray, event(which is 2 0 or 1) )
     passes = []
@@ -59,37 +94,55 @@ def calcPasses(satellite, startTime, hours, topo, minAltitude=0):
             "segments": []
         }
 
-        topocenteric = difference.at(t0)
-        alt, az, distance = topocenteric.altaz()
-        newPass["segments"].append({
-            "time": t0.utc_datetime(),
-            "alt": round(alt.degrees, 2),
-            "az": round(az.degrees, 2),
-            "distance": round(distance.km, 2)
-        })
-
-        topocenteric = difference.at(t1)
-        alt, az, distance = topocenteric.altaz()
-        newPass["segments"].append({
-            "time": t1.utc_datetime(),
-            "alt": round(alt.degrees, 2),
-            "az": round(az.degrees, 2),
-            "distance": round(distance.km, 2)
-        })
-
-        newPass["maxAlt"] = round(alt.degrees, 2)
+        # The ends of the window plus any culminations inside it
+        culminations = [] if orbit == ORBIT_FIXED else list(events[0])
+        times = [(t0, False)] + [(time, True) for time in culminations] + [(t1, False)]
+
+        for time, culminated in times:
+            topocenteric = difference.at(time)
+            alt, az, distance = topocenteric.altaz()
+            newPass["segments"].append({
+                "time": time.utc_datetime(),
+                "alt": round(alt.degrees, 2),
+                "az": round(az.degrees, 2),
+                "distance": round(distance.km, 2),
+                "rangeRate": round(float(rangeRate(topocenteric)), 3)
+            })
+
+            if culminated:
+                newPass["segments"][-1]["culmination"] = True
+
+        newPass["maxAlt"] = max(segment["alt"] for segment in newPass["segments"])
 
         if newPass["maxAlt"] < minAltitude:
             return []
 
+        if horizonMask is not None:
+            for segment in newPass["segments"]:
+                segment["obstructed"] = bool(segment["alt"] < horizonMask[horizonIndex(segment["az"])])
+
+            if all(segment["obstructed"] for segment in newPass["segments"]):
+                return []
+
+        if eph is not None:
+            annotateIllumination([newPass], satellite, topo, eph)
+
+            if visibleOnly and not newPass["visible"]:
+                return []
+
         return [newPass]
 
+    windows = []
+
     # print type of events data
     for i in range(0, len(events[0])):
         if events[1][i] == 0:
             riseTime = events[0][i]
         elif events[1][i] == 1:
-            culmTime = events[0][i]
+            # Eccentric orbits can culminate more than once in a pass, the
+            # highest one is kept
+            if culmTime is None or difference.at(events[0][i]).altaz()[0].degrees > difference.at(culmTime).altaz()[0].degrees:
+                culmTime = events[0][i]
 
         elif events[1][i] == 2:
             setTime = events[0][i]
@@ -100,13 +153,16 @@ def calcPasses(satellite, startTime, hours, topo, minAltitude=0):
             setTime = t1
 
         if setTime is not None:
-            if riseTime is None:
-                # Set time to now
-                riseTime = ts.now()
+            culminated = culmTime is not None
 
             if culmTime is None:
-                # Set time to now
-                culmTime = ts.now()
+                # Without a culmination in the window the pass is highest at
+                # whichever end of the window cut it
+                culmTime = t0 if riseTime is None else setTime
+
+            if riseTime is None:
+                # Already up at the start of the window
+                riseTime = t0
 
             newPass = {
                 "satellite": satellite.name,
@@ -136,60 +192,1871 @@ def calcPasses(satellite, startTime, hours, topo, minAltitude=0):
                     "time": culmTime.utc_datetime(),
                     "alt": round(alt.degrees, 2),
                     "az": round(az.degrees, 2),
-                    "distance": round(distance.km, 2)
+                    "distance": round(distance.km, 2),
+                    "rangeRate": round(float(rangeRate(topocenteric)), 3)
                 })
                 newPass["maxAlt"] = alt.degrees
 
-            interval_start = riseTime.utc_datetime()
-            interval_end = setTime.utc_datetime()
+                # Marks the TCA among samples rounded to the same altitude
+                if culminated:
+                    newPass["segments"][-1]["culmination"] = True
 
-            time_intervals = [interval_start + timedelta(seconds=30 * s)
-                          for s in range(int((interval_end - interval_start).total_seconds() / 30) + 1)]
-        
-            for t in time_intervals:
-                skyfield_time = ts.utc(t.year, t.month, t.day, t.hour, t.minute, t.second)
-                topocentric = difference.at(skyfield_time)
-                alt, az, distance = topocentric.altaz()
-                
-                if math.isnan(alt.degrees) or alt.degrees < 0:
-                    continue
-                
-                newPass["segments"].append({
-                    "time": t,
-                    "alt": round(alt.degrees, 2),
-                    "az": round(az.degrees, 2),
-                    "distance": round(distance.km, 2)
-                })
-
-            # Sort segments by time
-
-            newPass["segments"].sort(key=lambda x: x['time'])
-
-            passes.append(newPass)
+            windows.append(newPass)
             riseTime = None
             setTime = None
             culmTime = None
             newPass = None
-            
+
+    if eph is not None and visibleOnly:
+        windows = [newPass for newPass, candidate in zip(windows, visibilityCandidates(windows, satellite, topo, eph)) if candidate]
+
+    # Sample all passes in one batched call instead of one call per point
+    sample_times = []
+    owners = []
+
+    for index, newPass in enumerate(windows):
+        interval_start = newPass["startTime"].utc_datetime()
+        interval_end = newPass["endTime"].utc_datetime()
+
+        time_intervals = [interval_start + timedelta(seconds=30 * s)
+                      for s in range(int((interval_end - interval_start).total_seconds() / 30) + 1)]
+
+        sample_times.extend(time_intervals)
+        owners.extend([index] * len(time_intervals))
+
+    usable = np.ones(len(windows), dtype=bool)
+
+    if sample_times:
+        topocentric = difference.at(ts.from_datetimes(sample_times))
+        alt, az, distance = topocentric.altaz()
+        alts = np.round(alt.degrees, 2)
+        azs = np.round(az.degrees, 2)
+        distances = np.round(distance.km, 2)
+        rates = np.round(rangeRate(topocentric), 3)
+
+        if horizonMask is not None:
+            clearance = alt.degrees - horizonMask[horizonIndex(az.degrees)]
+            usable = applyHorizonMask(windows, sample_times, np.array(owners), clearance, horizonMask)
+
+        for i in np.flatnonzero(alt.degrees >= 0):
+            # Masked-out passes are dropped before any of their segments are stored
+            if not usable[owners[i]]:
+                continue
+
+            segment = {
+                "time": sample_times[i],
+                "alt": alts[i],
+                "az": azs[i],
+                "distance": distances[i],
+                "rangeRate": rates[i]
+            }
+
+            if horizonMask is not None:
+                segment["obstructed"] = bool(clearance[i] < 0)
+
+            windows[owners[i]]["segments"].append(segment)
+
+    for index, newPass in enumerate(windows):
+        if not usable[index]:
+            continue
+
+        # Sort segments by time
+        newPass["segments"].sort(key=lambda x: x['time'])
+        passes.append(newPass)
+
+    if eph is not None:
+        annotateIllumination(passes, satellite, topo, eph)
+
+        if visibleOnly:
+            passes = [newPass for newPass in passes if newPass["visible"]]
+
     print(f"{satellite.name} found {len(passes)} passes")
 
     return passes
 
+EARTH_RADIUS = 6378.137 # km, WGS84 equatorial
+EARTH_FLATTENING = 1 / 298.257223563 # WGS84
+EARTH_E2 = EARTH_FLATTENING * (2 - EARTH_FLATTENING) # eccentricity squared
+
+# The event search only looks for rises and sets halfway between
+# neighbouring culminations, so it misses the dips below the horizon of
+# eccentric orbits. Satellites slower than this are also checked on a grid.
+HORIZON_CHECK_REVS = 6.0 # revs/day
+HORIZON_CHECK_STEP = 300 # seconds, shorter dips are grazing and ignored
+
+@functools.lru_cache(maxsize=8)
+def horizonGrid(ts, start, end, step):
+    """
+    Sample times from start to end (tt Julian dates). Shared by every
+    satellite of a search, so the Earth rotation is only computed once.
+    """
+    count = int((end - start) * 86400 / step) + 1
+
+    return ts.tt_jd(np.append(start + np.arange(count) * step / 86400, end))
+
+def horizonCrossings(difference, t0, t1, ts, step=HORIZON_CHECK_STEP):
+    """
+    Finds the rises and sets over [t0, t1] by sampling the altitude every
+    step seconds and bisecting each change of side.
+    Returns:
+        tuple: (tt Julian dates, events) with 0 for a rise and 2 for a set.
+    """
+    grid = horizonGrid(ts, float(t0.tt), float(t1.tt), step)
+    tt = grid.tt
+    up = difference.at(grid).altaz()[0].degrees >= 0
+
+    changes = np.flatnonzero(up[1:] != up[:-1])
+    rising = ~up[changes]
+    lo = tt[changes]
+    hi = tt[changes + 1]
+
+    if len(changes):
+        # Down to a few milliseconds
+        while np.max(hi - lo) * 86400 > 0.005:
+            mid = (lo + hi) / 2
+            below = difference.at(ts.tt_jd(mid)).altaz()[0].degrees < 0
+            # Rising: still below at mid means the rise is later
+            later = below == rising
+            lo = np.where(later, mid, lo)
+            hi = np.where(later, hi, mid)
+
+    return (lo + hi) / 2, np.where(rising, 0, 2)
+
+def addMissedCrossings(events, crossings, ts):
+    """
+    Adds the grid crossings that have no rise or set of the same kind from
+    the event search within a grid step, keeping the searched times.
+    """
+    tt = np.atleast_1d(events[0].tt)
+    kinds = np.asarray(events[1])
+    missed = [
+        i for i, (time, kind) in enumerate(zip(*crossings))
+        if not np.any((kinds == kind) & (np.abs(tt - time) * 86400 < HORIZON_CHECK_STEP))
+    ]
+
+    if not missed:
+        return events
+
+    tt = np.concatenate([tt, crossings[0][missed]])
+    kinds = np.concatenate([kinds, crossings[1][missed]]).astype(kinds.dtype)
+    order = np.argsort(tt, kind="stable")
+
+    return ts.tt_jd(tt[order]), kinds[order]
+
+ORBIT_UNREACHABLE = "unreachable"
+ORBIT_FIXED = "fixed"
+ORBIT_SEARCH = "search"
+
+# Margins covering geodetic vs geocentric latitude and osculating vs mean
+# elements, so the prefilter never drops a satellite that can be seen
+REACH_MARGIN_DEG = 1.0
+APOGEE_MARGIN_KM = 50
+
+def classifyOrbit(satellite, topo, minAltitude, time):
+    """
+    Cheap check from the orbital elements of whether a pass search is needed.
+    Returns:
+        str: ORBIT_UNREACHABLE if the satellite can never climb above
+        minAltitude at the observer's latitude, ORBIT_FIXED for a
+        geostationary satellite that stays on one side of minAltitude all
+        day, ORBIT_SEARCH otherwise.
+    """
+    model = satellite.model
+    revsPerDay = model.no_kozai * 1440 / (2 * math.pi)
+    inclination = math.degrees(model.inclo)
+    # The ground track reaches the same latitudes for retrograde orbits
+    groundTrackLat = min(inclination, 180 - inclination)
+
+    # Near-GEO: its elevation only wobbles by about its inclination in a day
+    if abs(revsPerDay - 1.0027) < 0.01 and model.ecco < 0.01 and inclination < 5:
+        alt, az, distance = (satellite - topo).at(time).altaz()
+        wobble = inclination + REACH_MARGIN_DEG
+
+        if alt.degrees - wobble > max(minAltitude, 0) or alt.degrees + wobble < minAltitude:
+            return ORBIT_FIXED
+
+        return ORBIT_SEARCH
+
+    # Largest earth central angle from which the satellite is above
+    # minAltitude, at its highest altitude
+    elevation = math.radians(max(minAltitude, 0))
+    radius = EARTH_RADIUS * (1 + model.alta) + APOGEE_MARGIN_KM
+    reach = math.degrees(math.acos(EARTH_RADIUS * math.cos(elevation) / radius) - elevation)
+
+    if abs(topo.latitude.degrees) - groundTrackLat > reach + REACH_MARGIN_DEG:
+        return ORBIT_UNREACHABLE
+
+    return ORBIT_SEARCH
+
+# Resolution of the horizon mask lookup table, 0.1 degree of azimuth
+HORIZON_MASK_STEPS = 3600
+
+@functools.lru_cache(maxsize=None)
+def loadHorizonMask(path, mtime=None):
+    """
+    Compiles a CSV of "azimuth,min elevation" rows into a lookup table of
+    HORIZON_MASK_STEPS minimum elevations, interpolating linearly between
+    the given points (wrapping around north). Rows that don't parse, like a
+    header, are skipped. mtime is only part of the cache key.
+    """
+    azimuths = []
+    elevations = []
+
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            try:
+                azimuths.append(float(row[0]) % 360)
+                elevations.append(float(row[1]))
+            except (ValueError, IndexError):
+                continue
+
+    if not azimuths:
+        raise ValueError(f"No azimuth,elevation rows in horizon mask {path}")
+
+    order = np.argsort(azimuths)
+    grid = np.arange(HORIZON_MASK_STEPS) * 360 / HORIZON_MASK_STEPS
+
+    return np.interp(grid, np.array(azimuths)[order], np.array(elevations)[order], period=360)
+
+def horizonMaskFor(config):
+    path = config.get("horizon_mask")
+    if not path:
+        return None
+
+    path = os.path.expanduser(path)
+    return loadHorizonMask(path, os.path.getmtime(path))
+
+def horizonMaskKey(config):
+    """
+    Identifies the horizon mask in cache keys, including its modification
+    time so edits to the CSV invalidate cached passes.
+    """
+    path = config.get("horizon_mask")
+    if not path:
+        return None
+
+    path = os.path.expanduser(path)
+    return f"{path}|{os.path.getmtime(path)}"
+
+def horizonIndex(az):
+    return np.round(np.asarray(az) * HORIZON_MASK_STEPS / 360).astype(int) % HORIZON_MASK_STEPS
+
+def applyHorizonMask(windows, sampleTimes, owners, clearance, horizonMask):
+    """
+    Sets the unobstructed "aos", "los" and "usableDuration" (seconds) of each
+    pass from the clearance above the horizon mask of its samples. Crossings
+    of the mask are interpolated between samples.
+    Returns:
+        ndarray: Whether each pass has any unobstructed sample.
+    """
+    usable = np.zeros(len(windows), dtype=bool)
+    bounds = np.searchsorted(owners, np.arange(len(windows) + 1))
+
+    for index, newPass in enumerate(windows):
+        lo, hi = bounds[index], bounds[index + 1]
+        c = clearance[lo:hi]
+        clear = np.flatnonzero(c >= 0)
+
+        culmination = newPass["segments"][0]
+        culmination["obstructed"] = bool(culmination["alt"] < horizonMask[horizonIndex(culmination["az"])])
+
+        if len(clear) == 0:
+            continue
+
+        usable[index] = True
+        times = sampleTimes[lo:hi]
+
+        def crossing(i, j):
+            frac = c[i] / (c[i] - c[j])
+            return times[i] + (times[j] - times[i]) * frac
+
+        first, last = clear[0], clear[-1]
+        newPass["aos"] = times[first] if first == 0 else crossing(first - 1, first)
+        newPass["los"] = times[last] if last == len(c) - 1 else crossing(last, last + 1)
+
+        # Clear part of every sample interval, assuming linear clearance
+        a, b = c[:-1], c[1:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where((a >= 0) & (b >= 0), 1.0,
+                       np.where((a < 0) & (b < 0), 0.0,
+                       np.where(a >= 0, a / (a - b), b / (b - a))))
+        steps = np.array([(times[i + 1] - times[i]).total_seconds() for i in range(len(times) - 1)])
+        newPass["usableDuration"] = round(float(np.sum(fraction * steps)), 1)
+
+    return usable
+
+SPEED_OF_LIGHT = 299792.458 # km/s
+
+def rangeRate(topocentric):
+    """
+    Range rate in km/s (positive when receding) of a topocentric position,
+    from the velocity that comes with the same state vector.
+    """
+    r = topocentric.position.km
+    v = topocentric.velocity.km_per_s
+    return np.sum(r * v, axis=0) / np.linalg.norm(r, axis=0)
+
+def dopplerFrequencies(nominal, rates):
+    """
+    Doppler-corrected "downlink" (received on the ground) and "uplink" (to
+    transmit so the satellite hears the nominal frequency) frequencies for
+    the given range rates in km/s.
+    Parameters:
+        nominal (dict): Nominal "downlink"/"uplink" frequencies.
+        rates (ndarray): Range rates in km/s.
+    """
+    factor = 1 - np.asarray(rates) / SPEED_OF_LIGHT
+    shifted = {}
+
+    if "downlink" in nominal:
+        shifted["downlink"] = nominal["downlink"] * factor
+    if "uplink" in nominal:
+        shifted["uplink"] = nominal["uplink"] / factor
+
+    return shifted
+
+def annotateDoppler(passes, config):
+    """
+    Adds Doppler-corrected "downlink" and "uplink" frequencies in MHz to the
+    segments of satellites in the frequencies config. Uses the range rates
+    already stored on the segments, so nothing is re-propagated.
+    """
+    frequencies = config.get("frequencies", {})
+
+    for satPass in passes:
+        nominal = frequencies.get(satPass["satellite"])
+        if not nominal or not satPass["segments"]:
+            continue
+
+        rates = [segment["rangeRate"] for segment in satPass["segments"]]
+
+        for key, values in dopplerFrequencies(nominal, rates).items():
+            for segment, value in zip(satPass["segments"], np.round(values, 6)):
+                segment[key] = value
+
+TWILIGHT_STATES = [
+    (-0.8333, "day"),
+    (-6, "civil"),
+    (-12, "nautical"),
+    (-18, "astronomical"),
+]
+
+def twilightState(sunAlt):
+    for limit, state in TWILIGHT_STATES:
+        if sunAlt > limit:
+            return state
+    return "night"
+
+@functools.lru_cache(maxsize=None)
+def loadEphemeris(directory):
+    """
+    Loads the JPL ephemeris used for sun positions, downloading it into the
+    data directory on first use. Returns None if it cannot be loaded.
+    """
+    try:
+        return Loader(directory, verbose=False)('de421.bsp')
+    except Exception as e:
+        print(f"Could not load ephemeris, skipping illumination: {e}")
+        return None
+
+def illuminationAt(times, satellite, topo, eph):
+    """
+    Batched satellite-sunlit flags and observer sun altitudes for a list of
+    UTC datetimes.
+    """
+    t = load.timescale().from_datetimes(times)
+    sunlit = satellite.at(t).is_sunlit(eph)
+    sun_alt, _, _ = (eph['earth'] + topo).at(t).observe(eph['sun']).apparent().altaz()
+    return sunlit, sun_alt.degrees
+
+def visibilityCandidates(windows, satellite, topo, eph):
+    """
+    Cheap check at AOS, TCA and LOS of each pass, in one batched call. A pass
+    can only be visible if the observer is dark at AOS or LOS and the
+    satellite is sunlit at one of the three points, since darkness changes
+    monotonically and a pass crosses the shadow edge at most once.
+    """
+    if not windows:
+        return []
+
+    times = []
+    for window in windows:
+        times.extend([window["startTime"].utc_datetime(), window["segments"][0]["time"], window["endTime"].utc_datetime()])
+
+    sunlit, sun_alt = illuminationAt(times, satellite, topo, eph)
+    sunlit = sunlit.reshape(-1, 3)
+    dark = (sun_alt < -6).reshape(-1, 3)
+
+    return list((dark[:, 0] | dark[:, 2]) & sunlit.any(axis=1))
+
+def annotateIllumination(passes, satellite, topo, eph):
+    """
+    Adds "sunlit" and "sunAlt" to every segment, and "sunlit", "visible" and
+    "twilight" to every pass. All segment times are evaluated in one call.
+    """
+    times = [segment["time"] for satPass in passes for segment in satPass["segments"]]
+
+    if not times:
+        return
+
+    sunlit, sun_alt = illuminationAt(times, satellite, topo, eph)
+    i = 0
+
+    for satPass in passes:
+        for segment in satPass["segments"]:
+            segment["sunlit"] = bool(sunlit[i])
+            segment["sunAlt"] = round(float(sun_alt[i]), 1)
+            i += 1
+
+        segments = satPass["segments"]
+        satPass["sunlit"] = any(segment["sunlit"] for segment in segments)
+        satPass["visible"] = any(segment["sunlit"] and segment["sunAlt"] < -6 for segment in segments)
+        satPass["twilight"] = twilightState(min(segment["sunAlt"] for segment in segments))
+
+def cachedPasses(satellites, startTime, config, topo, ts):
+    """
+    calcAllPasses backed by the on-disk pass cache in the tle directory, so
+    repeated runs only re-predict satellites with new element sets.
+    """
+    cache = PassCache(os.path.join(config["tle"], "passes.json"))
+    cache.load(ts)
+    events, changed = cache.refresh(satellites, startTime, config, topo)
+    print(f"Re-predicted {changed}/{len(satellites)} satellites")
+    return events
+
+def illuminationEphemeris(config):
+    if config.get("illumination", DEFAULT_CONFIG["illumination"]) or config.get("visible_only"):
+        return loadEphemeris(config["tle"])
+    return None
+
+def calcAllPasses(satellites, startTime, config, topo, hours=None):
+    eph = illuminationEphemeris(config)
+    horizonMask = horizonMaskFor(config)
+    hours = config["hours"] if hours is None else hours
+
+    events = []
+    for sat in satellites:
+        events.extend(calcPasses(sat, startTime, hours, topo, config["min_alt"], eph=eph, visibleOnly=bool(config.get("visible_only")), horizonMask=horizonMask))
+
+    events.sort(key=lambda x: x['startTime'])
+    annotateDoppler(events, config)
+
+    return events
+
+def passToRecord(satPass):
+    """
+    JSON-serializable copy of a pass, with times as UTC ISO strings.
+    """
+    record = {}
+    for key, value in satPass.items():
+        if key == "segments":
+            value = [{**segment, "time": segment["time"].isoformat()} for segment in value]
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif hasattr(value, "utc_datetime"):
+            value = value.utc_datetime().isoformat()
+        record[key] = value
+    return record
+
+def passFromRecord(record, ts):
+    satPass = dict(record)
+    satPass["startTime"] = ts.from_datetime(datetime.fromisoformat(record["startTime"]))
+    satPass["endTime"] = ts.from_datetime(datetime.fromisoformat(record["endTime"]))
+    satPass["segments"] = [{**segment, "time": datetime.fromisoformat(segment["time"])} for segment in record["segments"]]
+
+    for key in ("aos", "los", "trackStart", "trackEnd"):
+        if isinstance(record.get(key), str):
+            satPass[key] = datetime.fromisoformat(record[key])
+
+    return satPass
+
+def mergePassRecords(first, second):
+    """
+    Joins two pieces of the same pass that were predicted in neighbouring
+    chunks: first is cut at the end of its chunk's search and second is
+    the part still in progress at the start of the next chunk.
+    """
+    merged = dict(first)
+    merged["endTime"] = max(first["endTime"], second["endTime"])
+
+    # The pieces are sampled on different grids, so only take the part of
+    # the second one that continues past the first
+    last = first["segments"][-1]["time"] if first["segments"] else first["startTime"]
+    merged["segments"] = first["segments"] + [segment for segment in second["segments"] if segment["time"] > last]
+
+    # A piece without a culmination in its own search takes its maximum from
+    # the cut, so the TCA and max altitude come from the joined segments
+    if merged["segments"]:
+        merged["maxAlt"] = max(segment["alt"] for segment in merged["segments"])
+    else:
+        merged["maxAlt"] = max(first["maxAlt"], second["maxAlt"])
+
+    if "visible" in first:
+        merged["sunlit"] = first["sunlit"] or second["sunlit"]
+        merged["visible"] = first["visible"] or second["visible"]
+        if merged["segments"]:
+            merged["twilight"] = twilightState(min(segment["sunAlt"] for segment in merged["segments"]))
+
+    if "aos" in first and "aos" in second:
+        aos = [datetime.fromisoformat(piece["aos"]) for piece in (first, second)]
+        los = [datetime.fromisoformat(piece["los"]) for piece in (first, second)]
+        overlap = max(0.0, (min(los) - max(aos)).total_seconds())
+        merged["aos"] = min(aos).isoformat()
+        merged["los"] = max(los).isoformat()
+        merged["usableDuration"] = round(first["usableDuration"] + second["usableDuration"] - overlap, 1)
+
+    return merged
+
+class PassCache:
+    """
+    Predicted passes per satellite, keyed by NORAD ID and name and tagged
+    with the element set epoch they were computed from. A refresh only
+    re-predicts satellites whose epoch changed (or that are new), and only
+    extends the window of the others, so refreshing a catalog costs in
+    proportion to what changed.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.params = None
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cacheParams(config):
+        return json.dumps({
+            "lat": config["lat"],
+            "lon": config["lon"],
+            "min_alt": config["min_alt"],
+            "visible_only": bool(config.get("visible_only")),
+            "illumination": bool(config.get("illumination", DEFAULT_CONFIG["illumination"])),
+            "horizon_mask": horizonMaskKey(config),
+        }, sort_keys=True)
+
+    def load(self, ts):
+        if self.path is None or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring pass cache {self.path}: {e}")
+            return
+
+        self.params = data["params"]
+        self.entries = {
+            key: {
+                "epoch": entry["epoch"],
+                "end": ts.from_datetime(datetime.fromisoformat(entry["end"])),
+                "passes": [passFromRecord(record, ts) for record in entry["passes"]],
+            }
+            for key, entry in data["satellites"].items()
+        }
+
+    def save(self):
+        if self.path is None:
+            return
+
+        data = {
+            "params": self.params,
+            "satellites": {
+                key: {
+                    "epoch": entry["epoch"],
+                    "end": entry["end"].utc_datetime().isoformat(),
+                    "passes": [passToRecord(satPass) for satPass in entry["passes"]],
+                }
+                for key, entry in self.entries.items()
+            },
+        }
+
+        # Local catalogs never go through fetchData, which creates the tle directory
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        writeFileAtomic(self.path, json.dumps(data))
+
+    def refresh(self, satellites, startTime, config, topo, should_stop=None):
+        """
+        Brings the cached passes up to date for the window starting at
+        startTime. The new entries are swapped in only once all satellites
+        are done.
+        Returns:
+            tuple: (sorted passes, number of re-predicted satellites), or
+            None if should_stop() became true.
+        """
+        with self.lock:
+            params = self.cacheParams(config)
+            previous = self.entries if params == self.params else {}
+
+            eph = illuminationEphemeris(config)
+            horizonMask = horizonMaskFor(config)
+            visible_only = bool(config.get("visible_only"))
+            end = startTime + timedelta(hours=config["hours"])
+
+            # Satellites outside this refresh (e.g. another filter) are kept as they are
+            entries = dict(previous)
+            keys = []
+            changed = 0
+
+            for sat in satellites:
+                if should_stop is not None and should_stop():
+                    return None
+
+                key = f"{sat.model.satnum}|{sat.name}"
+                keys.append(key)
+                epoch = sat.model.jdsatepoch + sat.model.jdsatepochF
+                entry = previous.get(key)
+
+                if entry is None or entry["epoch"] != epoch:
+                    passes = calcPasses(sat, startTime, config["hours"], topo, config["min_alt"], eph=eph, visibleOnly=visible_only, horizonMask=horizonMask)
+                    changed += 1
+                else:
+                    passes = [satPass for satPass in entry["passes"] if satPass["endTime"] > startTime]
+                    extend_from = entry["end"]
+
+                    cut = None
+
+                    # A pass cut off by the end of the old window is predicted again in full.
+                    # The search starts a minute early, a rise exactly at the start isn't found
+                    if passes and passes[-1]["endTime"].tt >= extend_from.tt:
+                        cut = passes.pop()
+                        extend_from = cut["startTime"] - timedelta(minutes=1)
+
+                    if end.tt > extend_from.tt:
+                        hours = (end.tt - extend_from.tt) * 24
+                        extension = calcPasses(sat, extend_from, hours, topo, config["min_alt"], eph=eph, visibleOnly=visible_only, horizonMask=horizonMask)
+                        passes.extend(satPass for satPass in extension if cut is None or satPass["endTime"].tt > cut["startTime"].tt)
+
+                entries[key] = {
+                    "epoch": epoch,
+                    "end": max(end, entry["end"]) if entry is not None and entry["epoch"] == epoch else end,
+                    "passes": passes,
+                }
+
+            self.params = params
+            self.entries = entries
+            self.save()
+
+        # Copies, so Doppler and schedule annotations never end up in the cache
+        events = [
+            {**satPass, "segments": [dict(segment) for segment in satPass["segments"]]}
+            for key in keys for satPass in entries[key]["passes"] if satPass["startTime"] < end
+        ]
+        events.sort(key=lambda x: x['startTime'])
+        annotateDoppler(events, config)
+
+        return events, changed
+
+def itrfToLatLon(xyz):
+    """
+    WGS84 geodetic latitude and longitude (degrees) of ITRF positions (km),
+    shaped (3, ...).
+    """
+    x, y, z = xyz
+    lon = np.arctan2(y, x)
+    p = np.hypot(x, y)
+    lat = np.arctan2(z, p * (1 - EARTH_E2))
+
+    # A few fixed point iterations converge well below a meter
+    for _ in range(3):
+        n = EARTH_RADIUS / np.sqrt(1 - EARTH_E2 * np.sin(lat) ** 2)
+        lat = np.arctan2(z + EARTH_E2 * n * np.sin(lat), p)
+
+    return np.degrees(lat), np.degrees(lon)
+
+class EphemerisStore:
+    """
+    Fixed-step ITRF positions of a catalog, shared on disk between spaceboi
+    processes. Positions live in a float32 .npy array of shape (satellites,
+    samples, 3) that is memory mapped read-only, so every process reads the
+    same pages instead of running SGP4 again. index.json maps NORAD ID and
+    name to a row, the element set epoch it was propagated from and the
+    samples it holds.
+
+    The store is rebuilt when an element set changes or a window it doesn't
+    cover is asked for. A rebuild keeps the rows of every other satellite,
+    so processes asking for different catalogs share one store, writes a
+    new array file and then swaps the index, so readers never see a half
+    written store. Rebuilds are serialized with a lock file.
+    """
+    def __init__(self, directory, step=30):
+        self.directory = directory
+        self.step = step
+        # (index, positions) swapped as one, the GUI reads it while a worker rebuilds
+        self.mapped = None
+        self.mtime = None
+
+    @staticmethod
+    def key(sat):
+        return f"{sat.model.satnum}|{sat.name}"
+
+    @staticmethod
+    def epoch(sat):
+        return sat.model.jdsatepoch + sat.model.jdsatepochF
+
+    @staticmethod
+    def span(index, entry):
+        # Stores written before rows had their own span hold the whole window
+        return entry.get("first", 0), entry.get("last", index["count"] - 1)
+
+    def load(self):
+        """
+        (Re)opens the store if another process rebuilt it since the last call.
+        """
+        path = os.path.join(self.directory, "index.json")
+
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime == self.mtime:
+                return
+
+            with open(path, 'r') as f:
+                index = json.load(f)
+
+            positions = np.load(os.path.join(self.directory, index["file"]), mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            self.mapped = self.mtime = None
+            return
+
+        self.mapped = (index, positions)
+        self.mtime = mtime
+
+    def covers(self, satellites, startTime, endTime):
+        self.load()
+
+        if self.mapped is None or self.mapped[0]["step"] != self.step:
+            return False
+
+        index = self.mapped[0]
+        first = (startTime.tt - index["start"]) * 86400 / self.step
+        last = (endTime.tt - index["start"]) * 86400 / self.step
+
+        for sat in satellites:
+            entry = index["satellites"].get(self.key(sat))
+            if entry is None or entry["epoch"] != self.epoch(sat):
+                return False
+
+            entryFirst, entryLast = self.span(index, entry)
+            if first < entryFirst or last > entryLast:
+                return False
+
+        return True
+
+    def build(self, satellites, startTime, hours):
+        """
+        Propagates the satellites over whole UTC days spanning the window,
+        streaming each row to a new array file. Holds the lock file while
+        building, and skips the build if another process built a store that
+        covers the window in the meantime.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(os.path.join(self.directory, "build.lock"), 'w') as lock:
+            # Released when the file is closed
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+
+            self.mtime = None
+            if self.covers(satellites, startTime, startTime + timedelta(hours=hours)):
+                return
+
+            self.write(satellites, startTime, hours)
+
+    def write(self, satellites, startTime, hours):
+        """
+        Writes the new array file and index. Called by build with the lock
+        held and the current store loaded.
+        """
+        ts = startTime.ts
+        day = startTime.utc_datetime().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = ts.from_datetime(day)
+        days = math.ceil(((startTime.tt - start.tt) * 24 + hours) / 24)
+        count = int(days * 86400 / self.step) + 1
+
+        old_index, old_positions = self.mapped if self.mapped is not None and self.mapped[0]["step"] == self.step else ({"satellites": {}}, None)
+        offset = 0
+
+        if old_positions is not None:
+            # Both windows start on a UTC midnight, so their samples line up
+            offset = round((old_index["start"] - start.tt) * 86400 / self.step)
+            # Keep the end of a longer window another process asked for
+            count = max(count, offset + old_index["count"])
+
+        times = ts.tt_jd(start.tt + np.arange(count) * self.step / 86400)
+        wanted = {self.key(sat) for sat in satellites}
+
+        # Other processes' satellites keep the part of their rows the new window overlaps
+        kept = {}
+        for key, entry in old_index["satellites"].items():
+            first, last = (bound + offset for bound in self.span(old_index, entry))
+            first, last = max(first, 0), min(last, count - 1)
+
+            if key not in wanted and last - first >= 3:
+                kept[key] = (entry, first, last)
+
+        name = f"positions-{os.getpid()}-{int(time.time() * 1000)}.npy"
+        positions = np.lib.format.open_memmap(os.path.join(self.directory, f"{name}.tmp"), mode='w+', dtype=np.float32, shape=(len(satellites) + len(kept), count, 3))
+        rows = {}
+        propagated = 0
+
+        for row, sat in enumerate(satellites):
+            entry = old_index["satellites"].get(self.key(sat))
+
+            if entry is not None and entry["epoch"] == self.epoch(sat) and self.span(old_index, entry)[0] + offset <= 0 and self.span(old_index, entry)[1] + offset >= count - 1:
+                positions[row] = old_positions[entry["row"], -offset:count - offset]
+            else:
+                positions[row] = sat.at(times).frame_xyz(itrs).km.T
+                propagated += 1
+
+            rows[self.key(sat)] = {"row": row, "epoch": self.epoch(sat), "first": 0, "last": count - 1}
+
+        for row, (key, (entry, first, last)) in enumerate(kept.items(), len(satellites)):
+            positions[row, first:last + 1] = old_positions[entry["row"], first - offset:last - offset + 1]
+            rows[key] = {"row": row, "epoch": entry["epoch"], "first": first, "last": last}
+
+        positions.flush()
+        del positions
+        os.replace(os.path.join(self.directory, f"{name}.tmp"), os.path.join(self.directory, name))
+
+        index = {"file": name, "start": start.tt, "step": self.step, "count": count, "satellites": rows}
+        writeFileAtomic(os.path.join(self.directory, "index.json"), json.dumps(index))
+
+        # Only builds write array files and they hold the lock, so every other
+        # one is stale. Processes still mapping one keep their pages until
+        # they reload.
+        for old in os.listdir(self.directory):
+            if old.startswith("positions-") and old != name:
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    # Still mapped on Windows, removed by a later build
+                    pass
+
+        print(f"Wrote ephemeris store for {len(rows)} satellites ({propagated} propagated), {days} days")
+        self.mtime = None
+        self.load()
+
+    def ensure(self, satellites, startTime, hours):
+        if not self.covers(satellites, startTime, startTime + timedelta(hours=hours)):
+            self.build(satellites, startTime, hours)
+        return self
+
+    def at(self, sat, times):
+        """
+        ITRF positions (km) of a satellite, shaped (3, len(times)), from
+        cubic interpolation between the stored samples. Returns None if the
+        satellite or the times aren't in the store.
+        """
+        mapped = self.mapped
+        if mapped is None:
+            return None
+
+        index, positions = mapped
+        entry = index["satellites"].get(self.key(sat))
+        if entry is None or entry["epoch"] != self.epoch(sat):
+            return None
+
+        u = (np.atleast_1d(times.tt) - index["start"]) * 86400 / index["step"]
+        first, last = self.span(index, entry)
+        if u.min() < first or u.max() > last:
+            return None
+
+        # 4 point Lagrange interpolation around each time
+        i = np.clip(np.floor(u).astype(int) - 1, first, last - 3)
+        x = (u - i)[:, None]
+        weights = [
+            -(x - 1) * (x - 2) * (x - 3) / 6,
+            x * (x - 2) * (x - 3) / 2,
+            -x * (x - 1) * (x - 3) / 2,
+            x * (x - 1) * (x - 2) / 6,
+        ]
+
+        samples = positions[entry["row"]]
+        xyz = sum(w * samples[i + k].astype(np.float64) for k, w in enumerate(weights))
+
+        return xyz.T
+
+# Extra time searched past the end of each chunk so passes rising near the
+# boundary are completed by the chunk that owns their AOS
+FORECAST_OVERLAP = timedelta(hours=1)
+
+# Slack when matching the cut edges of pass pieces against chunk bounds,
+# which round-trip through skyfield Times
+FORECAST_EDGE = timedelta(seconds=1)
+
+def forecastBounds(start, end, chunkHours, index):
+    """
+    Returns:
+        tuple: (chunk start, chunk end, search end) of chunk index.
+    """
+    chunk_start = start + timedelta(hours=chunkHours * index)
+    chunk_end = min(chunk_start + timedelta(hours=chunkHours), end)
+
+    return chunk_start, chunk_end, min(chunk_end + FORECAST_OVERLAP, end)
+
+def forecastChunk(omms, index, chunkStart, chunkEnd, searchEnd, config, path):
+    """
+    Predicts the passes rising in [chunkStart, chunkEnd) and writes them to
+    path as JSON lines. Runs in a worker process, so satellites are passed as
+    OMM dicts. Passes already in progress at chunkStart are kept as well;
+    stitchForecast joins them to the piece cut at the previous search end,
+    or drops them if the previous chunk saw the whole pass.
+    Returns:
+        tuple: (index, pass count)
+    """
+    ts = load.timescale()
+    topo = Topos(config["lat"], config["lon"])
+    satellites = [EarthSatellite.from_omm(ts, omm) for omm in omms]
+
+    hours = (searchEnd - chunkStart).total_seconds() / 3600
+    passes = [
+        satPass for satPass in calcAllPasses(satellites, ts.from_datetime(chunkStart), config, topo, hours=hours)
+        if satPass["startTime"].utc_datetime() < chunkEnd and satPass["startTime"].utc_datetime() >= chunkStart - FORECAST_EDGE
+    ]
+
+    with open(f"{path}.tmp", 'w') as f:
+        for satPass in passes:
+            f.write(json.dumps(passToRecord(satPass)) + "\n")
+
+    os.replace(f"{path}.tmp", path)
+
+    return index, len(passes)
+
+def stitchForecast(store, start, end, chunkHours, chunks):
+    """
+    Streams the chunk files in order into passes.jsonl, sorted by start
+    time. A pass longer than the overlap is cut at the end of one chunk's
+    search and continues at the start of the next, so those pieces are
+    merged back together. Only the last pass of each satellite and the
+    finished passes of the current chunk are held in memory.
+    Returns:
+        tuple: (path, pass count)
+    """
+    out_path = os.path.join(store, "passes.jsonl")
+    pending = {}
+    # (start, sequence, record) of finished passes, written once no pass
+    # still to come can start before them
+    ready = []
+    finished = 0
+    count = 0
+
+    def finish(record):
+        nonlocal finished
+        heapq.heappush(ready, (datetime.fromisoformat(record["startTime"]), finished, record))
+        finished += 1
+
+    def flush(out, limit=None):
+        nonlocal count
+
+        while ready and (limit is None or ready[0][0] < limit):
+            out.write(json.dumps(heapq.heappop(ready)[2]) + "\n")
+            count += 1
+
+    with open(f"{out_path}.tmp", 'w') as out:
+        for index in range(chunks):
+            chunk_start = forecastBounds(start, end, chunkHours, index)[0]
+            previous_search_end = forecastBounds(start, end, chunkHours, index - 1)[2] if index else None
+
+            # Later chunks only add passes from their start on, and pending
+            # ones can still grow but keep their start
+            flush(out, min([chunk_start - FORECAST_EDGE] + [datetime.fromisoformat(record["startTime"]) for record in pending.values()]))
+
+            with open(os.path.join(store, f"chunk_{index:04d}.jsonl")) as f:
+                for line in f:
+                    record = json.loads(line)
+                    previous = pending.get(record["satellite"])
+                    in_progress = index > 0 and abs(datetime.fromisoformat(record["startTime"]) - chunk_start) <= FORECAST_EDGE
+
+                    if previous is not None and in_progress:
+                        previous_end = datetime.fromisoformat(previous["endTime"])
+
+                        if abs(previous_end - previous_search_end) <= FORECAST_EDGE:
+                            pending[record["satellite"]] = mergePassRecords(previous, record)
+                            continue
+
+                        # The previous chunk already predicted this pass to its LOS
+                        if previous_end > chunk_start:
+                            continue
+
+                    if previous is not None:
+                        finish(previous)
+
+                    pending[record["satellite"]] = record
+
+        for record in pending.values():
+            finish(record)
+
+        flush(out)
+
+    os.replace(f"{out_path}.tmp", out_path)
+
+    return out_path, count
+
+def runForecast(satellites, startTime, config, store, chunkHours=24, workers=None):
+    """
+    Long-horizon prediction. The window is split into chunks that are
+    predicted in parallel worker processes, and each finished chunk is
+    written to the store directory. Re-running an interrupted forecast with
+    the same satellites, observer and settings resumes from the chunks
+    already on disk; a finished one is only reused while its start is still
+    inside the requested window.
+    Parameters:
+        satellites (list): EarthSatellites to predict.
+        startTime (Time): Start of the window, unless resuming.
+        config (dict): Configuration, "hours" is the window length.
+        store (str): Directory for the chunk files and the result.
+        chunkHours (int): Length of each chunk.
+        workers (int, optional): Number of worker processes.
+    Returns:
+        tuple: (path of passes.jsonl, pass count)
+    """
+    os.makedirs(store, exist_ok=True)
+
+    omms = [exporter.export_omm(sat.model, sat.name) for sat in satellites]
+    params = {
+        "lat": config["lat"],
+        "lon": config["lon"],
+        "min_alt": config["min_alt"],
+        "hours": config["hours"],
+        "chunk_hours": chunkHours,
+        "visible_only": bool(config.get("visible_only")),
+        "illumination": bool(config.get("illumination", DEFAULT_CONFIG["illumination"])),
+        "frequencies": config.get("frequencies", {}),
+        "horizon_mask": horizonMaskKey(config),
+        "satellites": sorted(f"{omm['NORAD_CAT_ID']}|{omm['OBJECT_NAME']}|{omm['EPOCH']}" for omm in omms),
+    }
+    key = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    manifest_path = os.path.join(store, "manifest.json")
+    manifest = None
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+    # A finished forecast is only reused while its start is still inside the
+    # requested window; an interrupted one is resumed from its own start
+    requested = startTime.utc_datetime()
+    resume = manifest is not None and manifest["key"] == key and (
+        not manifest.get("finished")
+        or requested <= datetime.fromisoformat(manifest["start"]) <= requested + timedelta(hours=config["hours"])
+    )
+
+    if resume:
+        print(f"Resuming forecast started at {manifest['start']}")
+    else:
+        for name in os.listdir(store):
+            if name.startswith("chunk_"):
+                os.remove(os.path.join(store, name))
+
+        manifest = {"key": key, "start": requested.isoformat(), "finished": False}
+        writeFileAtomic(manifest_path, json.dumps(manifest, indent=4))
+
+    start = datetime.fromisoformat(manifest["start"])
+    end = start + timedelta(hours=config["hours"])
+    chunks = math.ceil(config["hours"] / chunkHours)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+
+        for index in range(chunks):
+            path = os.path.join(store, f"chunk_{index:04d}.jsonl")
+            if os.path.exists(path):
+                continue
+
+            chunk_start, chunk_end, search_end = forecastBounds(start, end, chunkHours, index)
+            futures.append(executor.submit(forecastChunk, omms, index, chunk_start, chunk_end, search_end, config, path))
+
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            index, count = future.result()
+            print(f"Chunk {index + 1}/{chunks} done, {count} passes ({done}/{len(futures)})")
+
+    result = stitchForecast(store, start, end, chunkHours, chunks)
+
+    manifest["finished"] = True
+    writeFileAtomic(manifest_path, json.dumps(manifest, indent=4))
+
+    return result
+
+@functools.lru_cache(maxsize=None)
+def cachedTimezone(name):
+    return pytz.timezone(name)
+
+def localTimezone(config):
+    """
+    The observer's timezone, parsed once per name.
+    """
+    return cachedTimezone(config.get("timezone", DEFAULT_CONFIG["timezone"]))
+
 def formatPass(satPass, local_tz):
     passString = f"### Pass for {satPass['satellite']}\n"
     passString += f"**Start Time:** {satPass['startTime'].astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S')}\n"
     passString += f"**End Time:** {satPass['endTime'].astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S')}\n"
-    passString += f"**Max Alt:** {satPass['maxAlt']:.1f}\n\n"
+    passString += f"**Max Alt:** {satPass['maxAlt']:.1f}\n"
+
+    if "aos" in satPass:
+        passString += f"**Usable:** {satPass['aos'].astimezone(local_tz).strftime('%H:%M:%S')} - {satPass['los'].astimezone(local_tz).strftime('%H:%M:%S')} ({satPass['usableDuration'] / 60:.1f} min clear of the horizon mask)\n"
+
+    if "visible" in satPass:
+        passString += f"**Visible:** {'yes' if satPass['visible'] else 'no'} ({'sunlit' if satPass['sunlit'] else 'eclipsed'}, {satPass['twilight']})\n"
 
-    passString += f"| Time - {local_tz} | Altitude | Azimuth | Distance |\n"
-    passString += "|------|----------|---------|----------|\n"
+    passString += "\n"
+
+    # Doppler columns only for satellites with configured frequencies
+    extra = [key for key in ("downlink", "uplink") if satPass["segments"] and key in satPass["segments"][0]]
+
+    passString += f"| Time - {local_tz} | Altitude | Azimuth | Distance | Range Rate |{''.join(f' {key.capitalize()} |' for key in extra)}\n"
+    passString += f"|------|----------|---------|----------|------------|{'----------|' * len(extra)}\n"
     
     for segment in satPass["segments"]:
-        passString += f"| {segment['time'].astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S')} | {segment['alt']} | {segment['az']} | {segment['distance']} km |\n"
+        passString += f"| {segment['time'].astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S')} | {segment['alt']} | {segment['az']} | {segment['distance']} km | {segment.get('rangeRate', '')} km/s |{''.join(f' {segment[key]:.6f} MHz |' for key in extra)}\n"
     
     return passString
 
-def plot_event(satellite, event, ts, topo, ax=None):
+def passUid(satPass):
+    """
+    Stable calendar UID for a pass, derived from the satellite name and the
+    AOS time rounded to the minute so small TLE updates keep the same UID.
+    """
+    aos = satPass["startTime"].utc_datetime().replace(second=0, microsecond=0)
+    key = f"{satPass['satellite']}|{aos.strftime('%Y%m%dT%H%M')}"
+    return f"{hashlib.sha1(key.encode()).hexdigest()}@spaceboi"
+
+def passDigest(satPass, config):
+    """
+    Hash of what identifies a pass's calendar event. The segment table is
+    left out: it follows from the same elements as AOS/LOS/max alt, and
+    root-finding jitter between runs would otherwise mark every event as
+    changed. Used to detect which events changed between two exports.
+    The settings that add lines or columns to the description (frequencies,
+    horizon mask, illumination) are part of it too.
+    """
+    key = f"{satPass['satellite']}|{satPass['startTime'].utc_iso()}|{satPass['endTime'].utc_iso()}|{satPass['maxAlt']:.1f}"
+    key += f"|{config['lat']}|{config['lon']}|{config['timezone']}"
+    key += f"|{json.dumps(config.get('frequencies', {}).get(satPass['satellite']), sort_keys=True)}"
+    key += f"|{horizonMaskKey(config)}"
+    key += f"|{bool(config.get('illumination', DEFAULT_CONFIG['illumination']))}|{bool(config.get('visible_only'))}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def buildCalendarEvent(satPass, config, digest=None):
+    local_tz = localTimezone(config)
+
+    cal_event = icalendar.Event()
+    cal_event.add('uid', passUid(satPass))
+    cal_event.add('summary', f"Pass for {satPass['satellite']}")
+    cal_event.add('dtstart', satPass['startTime'].astimezone(local_tz))
+    cal_event.add('dtend', satPass['endTime'].astimezone(local_tz))
+    cal_event.add('dtstamp', datetime.now(pytz.utc))
+    cal_event.add('location', f"{config['lat']},{config['lon']}")
+    cal_event.add('description', formatPass(satPass, local_tz))
+
+    if digest is not None:
+        cal_event.add('x-spaceboi-hash', digest)
+
+    return cal_event
+
+def readCalendarEvents(path):
+    """
+    Reads the serialized VEVENT blocks of a previous export.
+    Returns:
+        dict: UID -> (digest, raw event bytes)
+    """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    existing = {}
+    start = data.find(b"BEGIN:VEVENT\r\n")
+
+    while start != -1:
+        end = data.find(b"END:VEVENT\r\n", start)
+        if end == -1:
+            break
+        end += len(b"END:VEVENT\r\n")
+        block = data[start:end]
+
+        uid = re.search(rb"^UID:(.*)\r$", block, re.MULTILINE)
+        digest = re.search(rb"^X-SPACEBOI-HASH:(.*)\r$", block, re.MULTILINE)
+        if uid and digest:
+            existing[uid.group(1).decode()] = (digest.group(1).decode(), block)
+
+        start = data.find(b"BEGIN:VEVENT\r\n", end)
+
+    return existing
+
+def exportCalendar(events, config, path):
+    """
+    Writes all passes to a single .ics feed. Events whose content did not
+    change since the last export are copied verbatim from the existing file,
+    so only new or changed passes are rebuilt.
+    Returns:
+        tuple: (written, reused, removed) event counts
+    """
+    existing = readCalendarEvents(path)
+
+    cal = icalendar.Calendar()
+    cal.add('prodid', '-//spaceboi//spaceboi//')
+    cal.add('version', '2.0')
+    cal.add('x-wr-calname', 'spaceboi')
+    header = cal.to_ical()[:-len(b"END:VCALENDAR\r\n")]
+
+    written = 0
+    reused = 0
+    seen = set()
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+
+        for event in events:
+            uid = passUid(event)
+            if uid in seen:
+                continue
+            seen.add(uid)
+
+            digest = passDigest(event, config)
+            previous = existing.get(uid)
+
+            if previous is not None and previous[0] == digest:
+                f.write(previous[1])
+                reused += 1
+            else:
+                f.write(buildCalendarEvent(event, config, digest).to_ical())
+                written += 1
+
+        f.write(b"END:VCALENDAR\r\n")
+
+    os.replace(tmp_path, path)
+
+    removed = len(set(existing) - seen)
+    print(f"Exported {len(seen)} passes to {path} ({written} written, {reused} unchanged, {removed} removed)")
+
+    return written, reused, removed
+
+class PassTrack:
+    """
+    Dense az/el/range-rate track of one pass, propagated once up front and
+    linearly interpolated on every tick instead of running SGP4 per tick.
+    """
+    def __init__(self, satellite, start, end, topo, config, step=1.0):
+        self.name = satellite.name
+        self.start = start
+        self.end = end
+
+        ts = load.timescale()
+        self.times = np.arange(start, end + step, step)
+        # Unix timestamps skip leap seconds, so convert them as fractional days
+        topocentric = (satellite - topo).at(ts.utc(1970, 1, 1 + self.times / 86400))
+        alt, az, _ = topocentric.altaz()
+
+        self.alt = alt.degrees
+        # Unwrapped so interpolation doesn't sweep through 180 at north
+        self.az = np.degrees(np.unwrap(az.radians))
+        self.rate = rangeRate(topocentric)
+        self.nominal = config.get("frequencies", {}).get(satellite.name, {})
+
+    def at(self, timestamp):
+        position = {
+            "az": float(np.interp(timestamp, self.times, self.az)) % 360,
+            "el": float(np.interp(timestamp, self.times, self.alt)),
+            "rangeRate": float(np.interp(timestamp, self.times, self.rate)),
+        }
+
+        for key, value in dopplerFrequencies(self.nominal, position["rangeRate"]).items():
+            position[key] = float(value)
+
+        return position
+
+class StdoutTrackSink:
+    def send(self, timestamp, name, position):
+        line = f"{datetime.fromtimestamp(timestamp, pytz.utc).isoformat(timespec='milliseconds')} {name} az={position['az']:.2f} el={position['el']:.2f} rr={position['rangeRate']:.3f}"
+
+        for key in ("downlink", "uplink"):
+            if key in position:
+                line += f" {key}={position[key]:.6f}"
+
+        print(line, flush=True)
+
+    def close(self):
+        pass
+
+class RotctldClient:
+    """
+    Minimal rotctld (hamlib) network client. Sends "P az el" set_pos commands
+    and waits for the RPRT reply of each.
+    """
+    def __init__(self, address):
+        host, _, port = address.rpartition(":")
+        self.sock = socket.create_connection((host or "localhost", int(port or 4533)))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('r')
+
+    def send(self, timestamp, name, position):
+        self.sock.sendall(f"P {position['az']:.2f} {max(position['el'], 0):.2f}\n".encode())
+        reply = self.reader.readline().strip()
+
+        if reply != "RPRT 0":
+            print(f"rotctld replied {reply!r}")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+def trackPass(track, sink, rate=10):
+    """
+    Streams a pass to the sink at a fixed rate until it ends. Ticks are
+    scheduled on absolute monotonic deadlines so sleep overshoot doesn't
+    accumulate.
+    Returns:
+        ndarray: Latency of each tick, from its deadline until its command was sent, in seconds.
+    """
+    period = 1.0 / rate
+    latencies = []
+    deadline = time.monotonic()
+
+    while True:
+        now = time.time()
+        if now >= track.end:
+            break
+
+        sink.send(now, track.name, track.at(now))
+        latencies.append(time.monotonic() - deadline)
+
+        deadline += period
+        delay = deadline - time.monotonic()
+
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Fell behind, skip the missed ticks instead of bursting
+            deadline = time.monotonic()
+
+    return np.array(latencies)
+
+def formatLatency(latencies):
+    if len(latencies) == 0:
+        return "no ticks"
+
+    ms = latencies * 1000
+    return f"{len(ms)} ticks, latency mean {ms.mean():.2f} ms, p99 {np.percentile(ms, 99):.2f} ms, max {ms.max():.2f} ms"
+
+def trackPasses(satellites, events, topo, config, sink, rate=10):
+    """
+    Drives a single antenna through the scheduled passes: parks at the AOS
+    position of the next pass, then streams positions while it is up.
+    """
+    satellite_dict = {sat.name: sat for sat in satellites}
+
+    for event in schedulePasses(events, config):
+        start = max(event["trackStart"].timestamp(), time.time())
+        end = event["trackEnd"].timestamp()
+
+        if end <= start:
+            continue
+
+        track = PassTrack(satellite_dict[event["satellite"]], start, end, topo, config)
+
+        wait = start - time.time()
+        if wait > 0:
+            print(f"Next pass {event['satellite']} at {event['trackStart'].astimezone(localTimezone(config)).strftime('%Y-%m-%d %H:%M:%S')}, parking at AOS")
+            sink.send(start, track.name, track.at(start))
+            time.sleep(wait)
+
+        latencies = trackPass(track, sink, rate)
+        print(f"Tracked {event['satellite']}: {formatLatency(latencies)}")
+
+def trackWindow(satPass, minAltitude):
+    """
+    Returns the (start, end) datetimes during which a pass is above
+    minAltitude and clear of the horizon mask, or None if no sampled segment
+    is.
+    """
+    above = [segment["time"] for segment in satPass["segments"] if segment["alt"] >= minAltitude and not segment.get("obstructed")]
+
+    if not above:
+        return None
+
+    return min(above), max(above)
+
+def schedulePasses(events, config):
+    """
+    Picks a conflict-free set of passes for a single antenna using weighted
+    interval scheduling. A pass occupies the antenna while it is above
+    min_alt plus the configured turnaround time. Its weight is the
+    satellite's priority (default 1, 0 never schedules), scaled up to 2x by
+    its max altitude so higher passes win between equal priorities.
+
+    Sets "scheduled", "trackStart" and "trackEnd" on every event.
+    Returns:
+        list: The scheduled events, sorted by start time.
+    """
+    priorities = config.get("priorities", {})
+    turnaround = config.get("turnaround", DEFAULT_CONFIG["turnaround"])
+
+    candidates = []
+
+    for event in events:
+        event["scheduled"] = False
+        window = trackWindow(event, config["min_alt"])
+        event["trackStart"], event["trackEnd"] = window if window else (None, None)
+
+        weight = priorities.get(event["satellite"], 1) * (1 + max(event["maxAlt"], 0) / 90)
+        if window is None or weight <= 0:
+            continue
+
+        candidates.append((window[0].timestamp(), window[1].timestamp() + turnaround, weight, event))
+
+    candidates.sort(key=lambda x: x[1])
+    ends = [c[1] for c in candidates]
+
+    # best[i] is the best total weight using the first i candidates
+    best = [0.0] * (len(candidates) + 1)
+    previous = [0] * len(candidates)
+
+    for i, (start, end, weight, event) in enumerate(candidates):
+        previous[i] = bisect.bisect_right(ends, start, 0, i)
+        best[i + 1] = max(best[i], weight + best[previous[i]])
+
+    scheduled = []
+    i = len(candidates)
+
+    while i > 0:
+        if best[i] == best[i - 1]:
+            i -= 1
+        else:
+            scheduled.append(candidates[i - 1][3])
+            i = previous[i - 1]
+
+    for event in scheduled:
+        event["scheduled"] = True
+
+    scheduled.sort(key=lambda x: x["trackStart"])
+
+    print(f"Scheduled {len(scheduled)}/{len(candidates)} trackable passes")
+
+    return scheduled
+
+def formatSchedule(scheduled, local_tz):
+    scheduleString = f"| Track Start - {local_tz} | Track End | Satellite | Max Alt |\n"
+    scheduleString += "|------|------|------|------|\n"
+
+    for event in scheduled:
+        scheduleString += f"| {event['trackStart'].astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S')} | {event['trackEnd'].astimezone(local_tz).strftime('%Y-%m-%d %H:%M:%S')} | {event['satellite']} | {event['maxAlt']:.1f} |\n"
+
+    return scheduleString
+
+NOTIFY_EVENTS = ("pre_aos", "aos", "tca", "los")
+
+# Notifications later than this (e.g. after the host was suspended) are dropped
+NOTIFY_GRACE = 60 # seconds
+
+def passNotifications(satPass, lead, kinds=NOTIFY_EVENTS):
+    """
+    (timestamp, kind) of every notification of a pass. AOS/LOS are the
+    usable ones when a horizon mask is set.
+    """
+    aos = satPass["aos"].timestamp() if "aos" in satPass else passSeconds(satPass["startTime"])
+    los = satPass["los"].timestamp() if "los" in satPass else passSeconds(satPass["endTime"])
+    times = {
+        "pre_aos": aos - lead,
+        "aos": aos,
+        "tca": passTca(satPass),
+        "los": los,
+    }
+    return [(times[kind], kind) for kind in kinds]
+
+def notificationPayload(kind, timestamp, satPass):
+    aos, los = [timestamp for timestamp, _ in passNotifications(satPass, 0, ("aos", "los"))]
+    return {
+        "event": kind,
+        "satellite": satPass["satellite"],
+        "time": datetime.fromtimestamp(timestamp, pytz.utc).isoformat(),
+        "aos": datetime.fromtimestamp(aos, pytz.utc).isoformat(),
+        "los": datetime.fromtimestamp(los, pytz.utc).isoformat(),
+        "max_alt": round(float(satPass["maxAlt"]), 1),
+    }
+
+class StdoutHook:
+    def fire(self, payload):
+        print(f"{payload['time']} {payload['event'].upper()} {payload['satellite']} (max alt {payload['max_alt']})", flush=True)
+
+class ShellHook:
+    """
+    Runs a shell command, with the notification in SPACEBOI_* environment
+    variables (SPACEBOI_EVENT, SPACEBOI_SATELLITE, ...).
+    """
+    def __init__(self, command):
+        self.command = command
+
+    def fire(self, payload):
+        env = dict(os.environ, **{f"SPACEBOI_{key.upper()}": str(value) for key, value in payload.items()})
+        subprocess.run(self.command, shell=True, env=env, check=False)
+
+class WebhookHook:
+    """
+    POSTs the notification as JSON.
+    """
+    def __init__(self, url):
+        self.url = url
+
+    def fire(self, payload):
+        requests.post(self.url, json=payload, timeout=10).raise_for_status()
+
+class DesktopHook:
+    def fire(self, payload):
+        title = f"{payload['satellite']} {payload['event'].upper().replace('_', '-')}"
+        body = f"Max alt {payload['max_alt']}, AOS {payload['aos']}"
+
+        if platform.system() == 'Linux':
+            subprocess.run(["notify-send", title, body], check=False)
+        elif platform.system() == 'Darwin':
+            subprocess.run(["osascript", "-e", f"display notification {json.dumps(body)} with title {json.dumps(title)}"], check=False)
+        else:
+            print(f"{title}: {body}")
+
+def notifyHooks(config):
+    hooks = []
+
+    if config.get("notify_command"):
+        hooks.append(ShellHook(config["notify_command"]))
+    if config.get("notify_webhook"):
+        hooks.append(WebhookHook(config["notify_webhook"]))
+    if config.get("notify_desktop"):
+        hooks.append(DesktopHook())
+
+    return hooks or [StdoutHook()]
+
+class PassNotifier:
+    """
+    Fires hooks at pre-AOS, AOS, TCA and LOS of upcoming passes. The
+    notifications sit in a heap and the loop sleeps until the next one (or
+    the next catalog refresh), so it doesn't poll. The heap is only rebuilt
+    when the set of passes changes.
+    """
+    def __init__(self, hooks, lead=timedelta(minutes=5), kinds=NOTIFY_EVENTS):
+        self.hooks = hooks
+        self.lead = lead.total_seconds()
+        self.kinds = kinds
+        self.heap = []
+        self.planned = None
+        self.stopped = threading.Event()
+
+    def plan(self, events, now=None):
+        """
+        Returns:
+            bool: Whether the pass set changed and the heap was rebuilt.
+        """
+        key = frozenset(passUid(satPass) for satPass in events)
+        if key == self.planned:
+            return False
+
+        now = time.time() if now is None else now
+        self.heap = [
+            (timestamp, index, kind, satPass)
+            for index, satPass in enumerate(events)
+            for timestamp, kind in passNotifications(satPass, self.lead, self.kinds)
+            if timestamp > now
+        ]
+        heapq.heapify(self.heap)
+        self.planned = key
+
+        print(f"Planned {len(self.heap)} notifications for {len(events)} passes")
+        return True
+
+    def fire(self, kind, timestamp, satPass):
+        payload = notificationPayload(kind, timestamp, satPass)
+
+        for hook in self.hooks:
+            # Hooks run on their own threads so a slow one can't delay the next event
+            threading.Thread(target=self.runHook, args=(hook, payload), daemon=True).start()
+
+    @staticmethod
+    def runHook(hook, payload):
+        try:
+            hook.fire(payload)
+        except Exception as e:
+            print(f"{type(hook).__name__} failed for {payload['satellite']} {payload['event']}: {e}")
+
+    def run(self, upcoming, refreshSeconds=3600):
+        """
+        Parameters:
+            upcoming (callable): Returns the current list of passes. If it
+                raises, the current notifications are kept.
+            refreshSeconds (float): How often upcoming() is asked again.
+        """
+        nextRefresh = 0
+
+        while not self.stopped.is_set():
+            now = time.time()
+
+            if now >= nextRefresh:
+                # A failed refresh (e.g. no network) keeps the planned
+                # notifications and is retried at the next refresh
+                try:
+                    self.plan(upcoming(), now)
+                except Exception as e:
+                    print(f"Could not refresh passes, retrying in {refreshSeconds:g} s: {e}")
+
+                nextRefresh = now + refreshSeconds
+
+            while self.heap and self.heap[0][0] <= now:
+                timestamp, index, kind, satPass = heapq.heappop(self.heap)
+                if now - timestamp <= NOTIFY_GRACE:
+                    self.fire(kind, timestamp, satPass)
+
+            wake = min(self.heap[0][0], nextRefresh) if self.heap else nextRefresh
+            self.stopped.wait(max(0, wake - time.time()))
+
+    def stop(self):
+        self.stopped.set()
+
+# Orbits of the synthetic validation catalog:
+# (name, revs/day, eccentricity, inclination, count)
+SYNTHETIC_ORBITS = [
+    ("LEO", 15.5, 0.0005, 51.6, 8),
+    ("SSO", 14.2, 0.001, 98.7, 8),
+    ("EQUATORIAL", 14.5, 0.001, 5.0, 4),
+    ("RETROGRADE", 13.0, 0.002, 140.0, 4),
+    ("MEO", 2.0, 0.005, 55.0, 4),
+    ("MOLNIYA", 2.006, 0.72, 63.4, 4),
+    ("GEO", 1.0027, 0.0002, 0.05, 6),
+    ("INCLINED GEO", 1.0027, 0.0005, 4.0, 2),
+]
+
+# Observers every catalog is validated from, besides the configured one
+VALIDATION_OBSERVERS = [
+    ("Equator", 0.0, 0.0),
+    ("Mid latitude", 40.7128, -74.006),
+    ("High latitude", 64.8, -147.7),
+    ("Southern", -33.9, 18.4),
+]
+
+def syntheticCatalog(ts, epoch, seed=0):
+    """
+    Deterministic catalog covering the orbit classes the fast paths treat
+    differently, as EarthSatellites built from OMM dicts.
+    """
+    rng = np.random.default_rng(seed)
+    satellites = []
+
+    for name, revsPerDay, eccentricity, inclination, count in SYNTHETIC_ORBITS:
+        for i in range(count):
+            satnum = 99000 + len(satellites)
+            omm = {
+                "OBJECT_NAME": f"{name} {i + 1}",
+                "OBJECT_ID": f"2000-{satnum % 1000:03d}A",
+                "EPOCH": epoch.utc_datetime().strftime('%Y-%m-%dT%H:%M:%S.%f'),
+                "MEAN_MOTION": revsPerDay,
+                "ECCENTRICITY": eccentricity,
+                "INCLINATION": inclination,
+                "RA_OF_ASC_NODE": rng.uniform(0, 360),
+                "ARG_OF_PERICENTER": 270.0 if name == "MOLNIYA" else rng.uniform(0, 360),
+                "MEAN_ANOMALY": rng.uniform(0, 360),
+                "EPHEMERIS_TYPE": 0,
+                "CLASSIFICATION_TYPE": "U",
+                "NORAD_CAT_ID": satnum,
+                "ELEMENT_SET_NO": 999,
+                "REV_AT_EPOCH": 0,
+                "BSTAR": 0.0001 if revsPerDay > 10 else 0.0,
+                "MEAN_MOTION_DOT": 0.0,
+                "MEAN_MOTION_DDOT": 0.0,
+            }
+            satellites.append(EarthSatellite.from_omm(ts, omm))
+
+    return satellites
+
+def searchEngine(satellites, startTime, config, topo):
+    """
+    The reference: a full event search for every satellite, no prefilter.
+    """
+    eph = illuminationEphemeris(config)
+    horizonMask = horizonMaskFor(config)
+    events = []
+
+    for sat in satellites:
+        events.extend(calcPasses(sat, startTime, config["hours"], topo, config["min_alt"], eph=eph, visibleOnly=bool(config.get("visible_only")), horizonMask=horizonMask, prefilter=False))
+
+    return events
+
+def calcEngine(satellites, startTime, config, topo):
+    return calcAllPasses(satellites, startTime, config, topo)
+
+def cacheEngine(satellites, startTime, config, topo, directory):
+    """
+    Warms a pass cache on a window starting half a window earlier, then times
+    the incremental refresh, which extends the window of every satellite.
+    """
+    cache = PassCache(os.path.join(directory, "passes.json"))
+    cache.refresh(satellites, startTime - timedelta(hours=config["hours"] / 2), config, topo)
+
+    started = time.perf_counter()
+    events, changed = cache.refresh(satellites, startTime, config, topo)
+
+    return events, time.perf_counter() - started
+
+def forecastEngine(satellites, startTime, config, topo, directory):
+    path, count = runForecast(satellites, startTime, config, os.path.join(directory, "forecast"), chunkHours=max(1, config["hours"] // 4))
+
+    with open(path) as f:
+        return [passFromRecord(json.loads(line), startTime.ts) for line in f]
+
+VALIDATION_ENGINES = {
+    "search": searchEngine,
+    "calc": calcEngine,
+    "cache": cacheEngine,
+    "forecast": forecastEngine,
+}
+
+# Engines that work in a scratch directory and time themselves
+TIMED_ENGINES = {"cache"}
+
+def runEngine(name, satellites, startTime, config, topo):
+    """
+    Returns:
+        tuple: (passes, seconds)
+    """
+    engine = VALIDATION_ENGINES[name]
+    started = time.perf_counter()
+
+    if engine in (cacheEngine, forecastEngine):
+        with tempfile.TemporaryDirectory() as directory:
+            result = engine(satellites, startTime, config, topo, directory)
+    else:
+        result = engine(satellites, startTime, config, topo)
+
+    if name in TIMED_ENGINES:
+        return result
+
+    return result, time.perf_counter() - started
+
+def passSeconds(value):
+    if hasattr(value, "utc_datetime"):
+        value = value.utc_datetime()
+    return value.timestamp()
+
+def passTca(satPass):
+    # Samples next to the culmination can round to the same altitude
+    return max(satPass["segments"], key=lambda segment: (segment["alt"], segment.get("culmination", False)))["time"].timestamp()
+
+def comparePasses(reference, candidate, windowStart, windowEnd):
+    """
+    Pairs up the passes of each satellite by the largest time overlap.
+    Passes cut by the window are predicted from where they are cut, so
+    engines may legitimately report a different AOS (cut at the start) or
+    LOS (cut at the end) and TCA/max altitude for them; those are not compared.
+    Returns:
+        dict: Max absolute AOS/LOS/TCA (s) and max altitude (deg) errors of
+        the matched passes, and the missed and extra pass counts.
+    """
+    stats = {"aos": 0.0, "los": 0.0, "tca": 0.0, "max_alt": 0.0, "missed": 0, "extra": 0, "matched": 0}
+
+    by_satellite = {}
+    for side, passes in ((0, reference), (1, candidate)):
+        for satPass in passes:
+            by_satellite.setdefault(satPass["satellite"], ([], []))[side].append(satPass)
+
+    for refs, cands in by_satellite.values():
+        unused = list(cands)
+
+        for ref in refs:
+            start, end = passSeconds(ref["startTime"]), passSeconds(ref["endTime"])
+            best, overlap = None, 0
+
+            for cand in unused:
+                shared = min(end, passSeconds(cand["endTime"])) - max(start, passSeconds(cand["startTime"]))
+                if shared > overlap or (best is None and shared >= 0):
+                    best, overlap = cand, shared
+
+            if best is None:
+                stats["missed"] += 1
+                continue
+
+            unused.remove(best)
+            stats["matched"] += 1
+            cutStart = start - windowStart < 1
+            cutEnd = windowEnd - end < 1
+
+            if not cutStart:
+                stats["aos"] = max(stats["aos"], abs(passSeconds(best["startTime"]) - start))
+            if not cutEnd:
+                stats["los"] = max(stats["los"], abs(passSeconds(best["endTime"]) - end))
+            if not (cutStart or cutEnd):
+                stats["tca"] = max(stats["tca"], abs(passTca(best) - passTca(ref)))
+                stats["max_alt"] = max(stats["max_alt"], abs(float(best["maxAlt"]) - float(ref["maxAlt"])))
+
+        stats["extra"] += len(unused)
+
+    return stats
+
+def validateEngines(catalogs, config, reference="search", candidate="calc", tolerances=None):
+    """
+    Runs the reference and candidate engines over every catalog and
+    observer, and checks the differences against the tolerances.
+    Parameters:
+        catalogs (list): (name, satellites, start Time) tuples.
+        config (dict): Configuration, lat/lon is added to the observers.
+        tolerances (dict, optional): Overrides of the default
+            validate_tolerances.
+    Returns:
+        tuple: (report rows, list of tolerance failures)
+    """
+    tolerances = {**DEFAULT_CONFIG["validate_tolerances"], **(tolerances or {})}
+    # A fixed observer at the configured site would only be run twice
+    observers = [("Configured", config["lat"], config["lon"])] + [
+        observer for observer in VALIDATION_OBSERVERS
+        if (observer[1], observer[2]) != (config["lat"], config["lon"])
+    ]
+    rows = []
+    failures = []
+
+    for catalogName, satellites, startTime in catalogs:
+        for observerName, lat, lon in observers:
+            observerConfig = {**config, "lat": lat, "lon": lon}
+            topo = Topos(lat, lon)
+
+            refPasses, refSeconds = runEngine(reference, satellites, startTime, observerConfig, topo)
+            candPasses, candSeconds = runEngine(candidate, satellites, startTime, observerConfig, topo)
+
+            windowStart = passSeconds(startTime)
+            stats = comparePasses(refPasses, candPasses, windowStart, windowStart + config["hours"] * 3600)
+            stats.update({
+                "catalog": catalogName,
+                "observer": observerName,
+                "passes": len(refPasses),
+                "reference_s": refSeconds,
+                "candidate_s": candSeconds,
+                "speedup": refSeconds / candSeconds if candSeconds > 0 else float("inf"),
+            })
+            rows.append(stats)
+
+            for key, limit in tolerances.items():
+                if stats[key] > limit:
+                    failures.append(f"{catalogName} / {observerName}: {key} {stats[key]:g} exceeds {limit:g}")
+
+    return rows, failures
+
+def formatValidation(rows, failures, reference, candidate):
+    report = f"### {candidate} vs {reference}\n"
+    report += "| Catalog | Observer | Passes | Missed | Extra | AOS s | LOS s | TCA s | Max Alt | Reference s | Candidate s | Speedup |\n"
+    report += "|------|------|------|------|------|------|------|------|------|------|------|------|\n"
+
+    for row in rows:
+        report += f"| {row['catalog']} | {row['observer']} | {row['passes']} | {row['missed']} | {row['extra']} | {row['aos']:.3f} | {row['los']:.3f} | {row['tca']:.3f} | {row['max_alt']:.3f} | {row['reference_s']:.2f} | {row['candidate_s']:.2f} | {row['speedup']:.1f}x |\n"
+
+    referenceTotal = sum(row["reference_s"] for row in rows)
+    candidateTotal = sum(row["candidate_s"] for row in rows)
+    report += f"\n**Total:** {referenceTotal:.2f} s vs {candidateTotal:.2f} s ({referenceTotal / candidateTotal if candidateTotal > 0 else float('inf'):.1f}x)\n"
+
+    if failures:
+        report += "\n**FAILED:**\n" + "".join(f"- {failure}\n" for failure in failures)
+    else:
+        report += "\n**PASSED:** all differences within tolerances\n"
+
+    return report
+
+def plot_event(satellite, event, ts, topo, ax=None, local_tz=None):
     """
     Plots a single satellite pass event on a polar plot.
     Parameters:
@@ -208,11 +2075,12 @@ def plot_event(satellite, event, ts, topo, ax=None):
     # Plot the pass
     ax.plot(azimuths, altitudes, label=f"{event['satellite']}", marker=None)
 
+    local_tz = local_tz or cachedTimezone(DEFAULT_CONFIG["timezone"])
     max_alt = max(altitudes)
-    start_label = "← Start " + times[0].astimezone(pytz.timezone('US/Eastern')).strftime('%H:%M')
-    end_label = "← End "+ times[-1].astimezone(pytz.timezone('US/Eastern')).strftime('%H:%M')
+    start_label = "← Start " + times[0].astimezone(local_tz).strftime('%H:%M')
+    end_label = "← End "+ times[-1].astimezone(local_tz).strftime('%H:%M')
     max_alt_index = np.argmax(altitudes)
-    max_alt_label = times[max_alt_index].astimezone(pytz.timezone('US/Eastern')).strftime('%H:%M')
+    max_alt_label = times[max_alt_index].astimezone(local_tz).strftime('%H:%M')
     
     # Annotate start time
     if max_alt_index != 0 and len(altitudes) > 2:
@@ -252,7 +2120,35 @@ def plot_event(satellite, event, ts, topo, ax=None):
     ax.set_xticks(np.radians([0, 90, 180, 270]))
     ax.set_xticklabels(['N', 'E', 'S', 'W'])
 
-def plot_events(satellites, events, ts, topo, ax=None):
+def plot_doppler(event, local_tz, ax=None):
+    """
+    Plots the Doppler shift of a pass's configured frequencies over time.
+    Parameters:
+        event (dict): A pass annotated by annotateDoppler.
+        ax (Axes, optional): Existing axis. If None, a new one will be created.
+    """
+    if ax is None:
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+
+    times = [s["time"] for s in event["segments"]]
+    factor = 1 - np.array([s["rangeRate"] for s in event["segments"]]) / SPEED_OF_LIGHT
+
+    for key in ("downlink", "uplink"):
+        if key not in event["segments"][0]:
+            continue
+
+        freqs = np.array([s[key] for s in event["segments"]])
+        nominal = np.mean(freqs / factor if key == "downlink" else freqs * factor)
+        # Offset from the nominal frequency, in kHz
+        ax.plot(times, (freqs - nominal) * 1000, label=key)
+
+    ax.set_ylabel("kHz", fontsize=7)
+    ax.tick_params(labelsize=6)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=local_tz))
+    ax.legend(fontsize=6)
+
+def plot_events(satellites, events, ts, topo, ax=None, local_tz=None):
     """
     Plots multiple satellite pass events on a single polar plot.
     Parameters:
@@ -271,23 +2167,399 @@ def plot_events(satellites, events, ts, topo, ax=None):
     for event in events:
         sat = satellite_dict.get(event["satellite"])
         if sat:
-            plot_event(sat, event, ts, topo, ax=ax)
+            plot_event(sat, event, ts, topo, ax=ax, local_tz=local_tz)
 
     # Add title and legend
     ax.set_title("Satellite Passes in the Sky", va='bottom')
     ax.legend(loc='upper right', bbox_to_anchor=(1.2, 1.05))
 
+# Per-process state of the render workers, set up once by initRenderWorker
+_render_worker = {}
+
+def initRenderWorker(omms, config):
+    ts = load.timescale()
+    _render_worker["ts"] = ts
+    _render_worker["config"] = config
+    _render_worker["topo"] = Topos(config["lat"], config["lon"])
+    _render_worker["satellites"] = {omm["OBJECT_NAME"]: EarthSatellite.from_omm(ts, omm) for omm in omms}
+    # Agg figure without pyplot, so no display is needed
+    _render_worker["figure"] = Figure(figsize=(6, 6))
+    _render_worker["ax"] = _render_worker["figure"].add_subplot(111, polar=True)
+
+def passFileName(satPass, fmt, local_tz):
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '_', satPass["satellite"]).strip('_')
+    return f"{name}_{satPass['startTime'].astimezone(local_tz).strftime('%Y-%m-%d_%H-%M')}.{fmt}"
+
+def renderPassBatch(records, directory, fmt):
+    """
+    Renders one sky plot per pass, clearing and reusing this worker's figure.
+    Returns:
+        list: Paths of the written files.
+    """
+    ts = _render_worker["ts"]
+    fig = _render_worker["figure"]
+    ax = _render_worker["ax"]
+    local_tz = localTimezone(_render_worker["config"])
+    paths = []
+
+    for record in records:
+        satPass = passFromRecord(record, ts)
+        ax.clear()
+        plot_event(_render_worker["satellites"][satPass["satellite"]], satPass, ts, _render_worker["topo"], ax=ax, local_tz=local_tz)
+        ax.set_title(f"{satPass['satellite']} Pass - {satPass['startTime'].astimezone(local_tz).strftime('%m/%d - %H:%M:%S')}")
+
+        path = os.path.join(directory, passFileName(satPass, fmt, local_tz))
+        fig.savefig(path, format=fmt)
+        paths.append(path)
+
+    return paths
+
+def renderContactSheet(records, path, fmt, cols=4):
+    """
+    Renders a page of sky plots, one small polar plot per pass.
+    """
+    ts = _render_worker["ts"]
+    fig = _render_worker["figure"]
+    local_tz = localTimezone(_render_worker["config"])
+    rows = math.ceil(len(records) / cols)
+
+    fig.clear()
+    fig.set_size_inches(cols * 3, rows * 3)
+
+    for i, record in enumerate(records):
+        satPass = passFromRecord(record, ts)
+        ax = fig.add_subplot(rows, cols, i + 1, polar=True)
+        plot_event(_render_worker["satellites"][satPass["satellite"]], satPass, ts, _render_worker["topo"], ax=ax, local_tz=local_tz)
+        ax.set_title(f"{satPass['satellite']}\n{satPass['startTime'].astimezone(local_tz).strftime('%m/%d %H:%M')}", fontsize=8)
+
+    fig.tight_layout()
+    fig.savefig(path, format=fmt)
+
+    # Restore the single pass layout
+    fig.clear()
+    fig.set_size_inches(6, 6)
+    _render_worker["ax"] = fig.add_subplot(111, polar=True)
+
+    return [path]
+
+def renderPasses(satellites, events, config, directory, fmt="png", contactSheet=False, workers=None, sheetSize=24):
+    """
+    Renders pass sky plots to image files in parallel worker processes.
+    Parameters:
+        satellites (list): EarthSatellites the passes belong to.
+        events (list): Passes to render.
+        config (dict): Configuration.
+        directory (str): Output directory.
+        fmt (str): Any format savefig supports, e.g. "png" or "svg".
+        contactSheet (bool): Render pages of sheetSize passes instead of one file per pass.
+        workers (int, optional): Number of worker processes.
+    Returns:
+        list: Paths of the written files.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    names = {event["satellite"] for event in events}
+    omms = [exporter.export_omm(sat.model, sat.name) for sat in satellites if sat.name in names]
+    records = [passToRecord(event) for event in events]
+
+    workers = workers or os.cpu_count() or 1
+    paths = []
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initRenderWorker, initargs=(omms, config)) as executor:
+        if contactSheet:
+            futures = [
+                executor.submit(renderContactSheet, records[i:i + sheetSize], os.path.join(directory, f"passes_{i // sheetSize + 1:03d}.{fmt}"), fmt)
+                for i in range(0, len(records), sheetSize)
+            ]
+        else:
+            # A few batches per worker to keep them busy without per-pass overhead
+            size = max(1, math.ceil(len(records) / (workers * 4)))
+            futures = [executor.submit(renderPassBatch, records[i:i + size], directory, fmt) for i in range(0, len(records), size)]
+
+        for future in concurrent.futures.as_completed(futures):
+            paths.extend(future.result())
+
+    print(f"Rendered {len(paths)} {'contact sheets' if contactSheet else 'pass plots'} to {directory}")
+
+    return paths
+
+COVERAGE_METRICS = {
+    "passes": "Passes",
+    "minutes": "Minutes above min alt",
+    "max_alt": "Max altitude (deg)"
+}
+
+def observerGrid(resolution):
+    """
+    Latitudes and longitudes (degrees) of a global observer grid.
+    """
+    lats = np.arange(-90, 90 + resolution / 2, resolution)
+    lons = np.arange(-180, 180, resolution)
+    return lats, lons
+
+def observerVectors(lats, lons):
+    """
+    WGS84 ITRF positions (km) and local up vectors of every point of a
+    lat/lon grid, flattened row by row (latitude major).
+    """
+    lat, lon = np.meshgrid(np.radians(lats), np.radians(lons), indexing='ij')
+    lat, lon = lat.ravel(), lon.ravel()
+    n = EARTH_RADIUS / np.sqrt(1 - EARTH_E2 * np.sin(lat) ** 2)
+
+    up = np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+    positions = np.stack([n * up[:, 0], n * up[:, 1], n * (1 - EARTH_E2) * up[:, 2]], axis=1)
+
+    return positions, up
+
+def coverageGrid(satellites, startTime, config, resolution=1.0, metric="passes", step=30, chunk=64, store=None):
+    """
+    Pass statistics of the satellites over a global observer grid. Each
+    satellite is propagated once over the window, and the elevation test is
+    done for all grid points at once, a chunk of time steps at a time.
+    Parameters:
+        satellites (list): EarthSatellites to count.
+        startTime (Time): Start of the window.
+        config (dict): Configuration, for hours and min_alt.
+        resolution (float): Grid spacing in degrees.
+        metric (str): "passes", "minutes" (above min_alt) or "max_alt".
+        step (int): Seconds between samples.
+        store (EphemerisStore, optional): Read positions from the store instead of propagating.
+    Returns:
+        tuple: (lats, lons, values) with values shaped (len(lats), len(lons)).
+    """
+    if metric not in COVERAGE_METRICS:
+        raise ValueError(f"Unknown coverage metric {metric}, expected one of {', '.join(COVERAGE_METRICS)}")
+
+    lats, lons = observerGrid(resolution)
+    positions, up = observerVectors(lats, lons)
+    upDotPosition = np.einsum('ij,ij->i', up, positions)
+    positionNorm = np.einsum('ij,ij->i', positions, positions)
+    sinMinAlt = math.sin(math.radians(config["min_alt"]))
+
+    count = int(config["hours"] * 3600 / step) + 1
+    times = startTime.ts.tt_jd(startTime.tt + np.arange(count) * step / 86400)
+
+    if metric == "max_alt":
+        values = np.full(len(positions), -1.0)
+    else:
+        values = np.zeros(len(positions))
+
+    for sat in satellites:
+        satPositions = store.at(sat, times) if store is not None else None
+        if satPositions is None:
+            satPositions = sat.at(times).frame_xyz(itrs).km
+        satPositions = satPositions.T
+        previous = np.zeros(len(positions), dtype=bool)
+
+        for i in range(0, count, chunk):
+            block = satPositions[i:i + chunk]
+
+            # sin(elevation) = up . (sat - observer) / |sat - observer|
+            distance = np.sqrt(np.einsum('ij,ij->i', block, block)[:, None] + positionNorm[None, :] - 2 * block @ positions.T)
+            sinAlt = (block @ up.T - upDotPosition[None, :]) / distance
+
+            if metric == "max_alt":
+                np.maximum(values, sinAlt.max(axis=0), out=values)
+                continue
+
+            above = sinAlt >= sinMinAlt
+
+            if metric == "passes":
+                before = np.vstack([previous[None, :], above[:-1]])
+                values += np.count_nonzero(above & ~before, axis=0)
+                previous = above[-1]
+            else:
+                values += np.count_nonzero(above, axis=0) * step / 60
+
+        print(f"{sat.name} coverage done")
+
+    if metric == "max_alt":
+        values = np.degrees(np.arcsin(np.clip(values, -1, 1)))
+
+    return lats, lons, values.reshape(len(lats), len(lons))
+
+def plot_coverage(lats, lons, values, metric, ax=None, my_map=None):
+    if my_map is None:
+        my_map = initialize_map(ax)
+
+    # The grid stops one step short of +180, wrap the first column around so
+    # the cells reach the edge of the map
+    lons = np.append(lons, lons[0] + 360)
+    values = np.concatenate([values, values[:, :1]], axis=1)
+
+    lon, lat = np.meshgrid(lons, lats)
+    mesh = my_map.pcolormesh(lon, lat, values, latlon=True, shading='nearest', cmap='viridis', alpha=0.7)
+    ax.figure.colorbar(mesh, ax=ax, orientation='horizontal', pad=0.05, label=COVERAGE_METRICS[metric])
+
+    return my_map
+
+def renderCoverage(lats, lons, values, metric, path, fmt="png"):
+    # Agg figure without pyplot, so no display is needed
+    fig = Figure(figsize=(12, 8))
+    ax = fig.add_subplot(111)
+    plot_coverage(lats, lons, values, metric, ax=ax)
+    fig.savefig(path, format=fmt)
+    return path
+
+def catalogSourceLabel(source):
+    """
+    Short name of a catalog source for the GUI, e.g. the CelesTrak group.
+    """
+    parsed = urllib.parse.urlparse(source)
+    query = urllib.parse.parse_qs(parsed.query)
+
+    for key in ("GROUP", "NAME", "CATNR"):
+        if key in query:
+            return query[key][0]
+
+    return os.path.basename(parsed.path) or parsed.netloc or source
+
+class SatelliteListModel(QAbstractListModel):
+    """
+    Checkable list of catalog entries (name, NORAD ID, source), grouped by
+    source under a header row when there is more than one. The checked
+    names are a set kept in step with config["satellites"], and rows are
+    only materialized when the view asks for them.
+    """
+    checkedChanged = pyqtSignal(str, bool)
+
+    SatnumRole = Qt.UserRole + 1
+    SourceRole = Qt.UserRole + 2
+
+    def __init__(self, checked, parent=None):
+        super().__init__(parent)
+        # (source, entry) per row, entry is None for a source header
+        self.rows = []
+        self.checked = set(checked)
+
+    def setCatalog(self, catalog):
+        groups = {}
+        for entry in catalog:
+            groups.setdefault(entry[2], []).append(entry)
+
+        self.beginResetModel()
+        self.rows = []
+        for source, entries in groups.items():
+            if len(groups) > 1:
+                self.rows.append((source, None))
+            self.rows.extend((source, entry) for entry in sorted(entries))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        source, entry = self.rows[index.row()]
+
+        if entry is None:
+            if role == Qt.DisplayRole:
+                return catalogSourceLabel(source)
+            if role == Qt.ToolTipRole or role == self.SourceRole:
+                return source
+            if role == Qt.FontRole:
+                font = QFont()
+                font.setBold(True)
+                return font
+            return None
+
+        name, satnum, source = entry
+
+        if role == Qt.DisplayRole:
+            return name
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if name in self.checked else Qt.Unchecked
+        if role == Qt.ToolTipRole:
+            return f"{satnum} - {source}"
+        if role == self.SatnumRole:
+            return satnum
+        if role == self.SourceRole:
+            return source
+
+        return None
+
+    def flags(self, index):
+        if index.isValid() and self.rows[index.row()][1] is None:
+            return Qt.ItemIsEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid() or self.rows[index.row()][1] is None:
+            return False
+
+        name = self.rows[index.row()][1][0]
+        checked = value == Qt.Checked
+
+        if checked == (name in self.checked):
+            return False
+
+        if checked:
+            self.checked.add(name)
+        else:
+            self.checked.discard(name)
+
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.checkedChanged.emit(name, checked)
+        return True
+
+class SatelliteFilterProxyModel(QSortFilterProxyModel):
+    """
+    Filters the satellite list by a search text, matched against the name
+    or the start of the NORAD ID, and optionally by catalog source. A source
+    header is shown while any of its satellites is.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search = ""
+        self.source = None
+
+    def setSearch(self, text):
+        self.search = text.strip().casefold()
+        self.invalidateFilter()
+
+    def setSource(self, source):
+        self.source = source
+        self.invalidateFilter()
+
+    def acceptsEntry(self, entry):
+        name, satnum, source = entry
+
+        if self.source is not None and source != self.source:
+            return False
+
+        return not self.search or self.search in name.casefold() or str(satnum).startswith(self.search)
+
+    def filterAcceptsRow(self, row, parent):
+        rows = self.sourceModel().rows
+        source, entry = rows[row]
+
+        if entry is not None:
+            return self.acceptsEntry(entry)
+
+        # The group runs until the next header
+        for next_row in range(row + 1, len(rows)):
+            source, entry = rows[next_row]
+            if entry is None:
+                break
+            if self.acceptsEntry(entry):
+                return True
+
+        return False
+
 class WorkerSignals(QObject):
     finished = pyqtSignal(dict)  # Emit list of satellites
     error = pyqtSignal(str)      # Emit error message as a string
 
 class Worker(QRunnable):
-    def __init__(self, urls, ts, config, filter_enabled):
+    def __init__(self, urls, ts, config, filter_enabled, pass_cache):
         super().__init__()
         self.urls = urls
         self.ts = ts
         self.config = config
         self.filter_enabled = filter_enabled
+        self.pass_cache = pass_cache
         self.signals = WorkerSignals()
         self._is_running = True
 
@@ -298,28 +2570,110 @@ class Worker(QRunnable):
     def run(self):
         try:
             filtered_satellites, satellites = fetchAllData(self.config, self.ts)
-            events = []
             topo = Topos(self.config["lat"], self.config["lon"])
 
-            for sat in filtered_satellites:
-                if not self._is_running:
-                    return
+            result = self.pass_cache.refresh(filtered_satellites, self.ts.now(), self.config, topo, should_stop=lambda: not self._is_running)
+            if result is None:
+                return
 
-                events.extend(
-                  calcPasses(sat, self.ts.now(), self.config["hours"], topo, minAltitude=self.config["min_alt"])
-                )
+            events, changed = result
+            print(f"Re-predicted {changed}/{len(filtered_satellites)} satellites")
+            schedulePasses(events, self.config)
 
-            events.sort(key=lambda x: x['startTime'])
-            
             self.signals.finished.emit( {
                 "satellites": filtered_satellites,
                 "events": events,
-                "all_sat_names": [sat.name for sat in satellites]
+                "catalog": [(sat.name, sat.model.satnum, getattr(sat, "source", "")) for sat in satellites]
             })
 
         except Exception as e:
             self.signals.error.emit(str(e))  # Emit the error message
 
+class EphemerisWorker(QRunnable):
+    """
+    Brings the ephemeris store up to date for the satellites on the map,
+    after the passes are shown.
+    """
+    def __init__(self, store, satellites, ts, hours):
+        super().__init__()
+        self.store = store
+        self.satellites = satellites
+        self.ts = ts
+        self.hours = hours
+        self.signals = WorkerSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.store.ensure(self.satellites, self.ts.now(), self.hours)
+            self.signals.finished.emit({"satellites": self.satellites})
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+def writeFileAtomic(path, text):
+    """
+    Writes text to a temp file next to path, syncs it and renames it over
+    path, so a crash leaves either the old or the new file.
+    """
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+class ConfigWriter:
+    """
+    Persists the GUI's config dict. Changes are coalesced until no save was
+    asked for delay ms, then the config is serialized on the GUI thread and
+    written by a single background thread (so writes stay in order). Writes
+    are skipped when the serialized config matches what's on disk.
+    """
+    def __init__(self, config, delay=500):
+        self.config = config
+        self.path = config["config"]
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        try:
+            with open(self.path, 'r') as f:
+                self.written = f.read()
+        except OSError:
+            self.written = None
+
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.flush)
+
+    def save(self):
+        self.timer.start()
+
+    def flush(self):
+        self.timer.stop()
+        text = json.dumps(self.config, indent=4)
+
+        if text == self.written:
+            return
+
+        self.written = text
+        self.executor.submit(self.write, text)
+
+    def write(self, text):
+        try:
+            writeFileAtomic(self.path, text)
+        except OSError as e:
+            print(f"Error writing config {self.path}: {e}")
+
+    def close(self):
+        """
+        Writes any pending change and waits for it.
+        """
+        if self.timer.isActive():
+            self.flush()
+        self.executor.shutdown(wait=True)
+
 dark_stylesheet = """
     QMainWindow {
         background-color: #2b2b2b;
@@ -343,12 +2697,15 @@ class SatelliteApp(QMainWindow):
         self.thread_pool = QThreadPool()
         self.satellites = []
         self.events = []
-        self.all_sat_names = []
         self.active_workers = []
         self.ts = ts
         self.topo = Topos(config["lat"], config["lon"])
         self.config = config
         self.selected_sat = None
+        self.pass_cache = PassCache(os.path.join(config["tle"], "passes.json"))
+        self.pass_cache.load(ts)
+        self.ephemeris_store = EphemerisStore(os.path.join(config["tle"], "ephemeris"))
+        self.config_writer = ConfigWriter(config)
 
         self.setWindowIcon(QIcon(os.path.join( os.path.curdir, 'assets/spaceboi_small.png' )))
 
@@ -419,9 +2776,32 @@ class SatelliteApp(QMainWindow):
         lat_lon_layout.addWidget(lon_widget)
         config_layout.addLayout(lat_lon_layout)
 
-        self.sat_list_widget = QListWidget()
+        # Model backed list, the view only renders the visible rows
+        self.sat_model = SatelliteListModel(self.config["satellites"])
+        self.sat_model.checkedChanged.connect(self.on_satellite_selection_changed)
+        self.sat_proxy = SatelliteFilterProxyModel()
+        self.sat_proxy.setSourceModel(self.sat_model)
+
+        self.sat_list_widget = QListView()
+        self.sat_list_widget.setModel(self.sat_proxy)
+        self.sat_list_widget.setUniformItemSizes(True)
         self.sat_list_widget.setSelectionMode(QAbstractItemView.NoSelection)
-        self.sat_list_widget.itemChanged.connect(self.on_satellite_selection_changed)
+
+        search_layout = QHBoxLayout()
+        sat_search = QLineEdit()
+        sat_search.setPlaceholderText("Search name or NORAD ID")
+        sat_search.textChanged.connect(self.on_sat_search_changed)
+        search_layout.addWidget(sat_search)
+
+        self.sat_source_combo = QComboBox()
+        self.sat_source_combo.currentIndexChanged.connect(self.on_sat_source_changed)
+        search_layout.addWidget(self.sat_source_combo)
+
+        # Filter once typing pauses instead of on every key
+        self.sat_search_timer = QTimer()
+        self.sat_search_timer.setSingleShot(True)
+        self.sat_search_timer.setInterval(150)
+        self.sat_search_timer.timeout.connect(lambda: self.sat_proxy.setSearch(sat_search.text()))
 
         select_sats_layout = QHBoxLayout()
         select_sats_layout.addWidget(QLabel("Select Satellites:"))
@@ -435,6 +2815,7 @@ class SatelliteApp(QMainWindow):
         select_sats_layout.addWidget(sat_filter_enabled)
 
         sat_list_layout.addLayout(select_sats_layout)
+        sat_list_layout.addLayout(search_layout)
         sat_list_layout.addWidget(self.sat_list_widget)
         config_layout.addLayout(sat_list_layout)
 
@@ -442,6 +2823,10 @@ class SatelliteApp(QMainWindow):
         refresh_btn.clicked.connect(self.refresh_data)
         config_layout.addWidget(refresh_btn)
 
+        export_btn = QPushButton("Export All to Calendar")
+        export_btn.clicked.connect(self.export_all_passes)
+        config_layout.addWidget(export_btn)
+
         bottom_left_layout.addLayout(config_layout, stretch=1)
 
         # Add table
@@ -469,6 +2854,7 @@ class SatelliteApp(QMainWindow):
         self.single_ax.set_xticks([])
         self.single_ax.set_yticks([])
         self.single_ax.spines['polar'].set_visible(False)
+        self.doppler_ax = None
 
         # Timer for updating plot
         self.timer = QTimer(self)
@@ -479,13 +2865,20 @@ class SatelliteApp(QMainWindow):
         self.map_timer.timeout.connect(self.update_map_plot)
         self.map_timer.start(5000)
 
+        # Pick up new element sets in the background, only changed satellites are re-predicted
+        self.catalog_timer = QTimer(self)
+        self.catalog_timer.timeout.connect(self.refresh_data)
+        self.catalog_timer.start(int(self.config.get("refresh_minutes", DEFAULT_CONFIG["refresh_minutes"]) * 60 * 1000))
+
         self.refresh_data()
         
     def closeEvent(self, event):
         self.stop_all_workers()
         
         self.timer.stop()
+        self.catalog_timer.stop()
         self.thread_pool.clear()
+        self.config_writer.close()
         event.accept()
 
     def refresh_data(self):
@@ -493,7 +2886,7 @@ class SatelliteApp(QMainWindow):
          self.stop_all_workers()
          self.table.setDisabled(True)  # Disable UI while refreshing
 
-         worker = Worker(self.config["urls"], self.ts, self.config, self.config["filter_enabled"])
+         worker = Worker(self.config["urls"], self.ts, self.config, self.config["filter_enabled"], self.pass_cache)
          worker.signals.finished.connect(self.on_refresh_data_finished)
          worker.signals.error.connect(self.on_refresh_data_error)
 
@@ -505,21 +2898,25 @@ class SatelliteApp(QMainWindow):
 
         self.events.clear()
         self.satellites.clear()
-        self.all_sat_names.clear()
 
         self.satellites = result["satellites"]
         self.events = result["events"]
-        self.all_sat_names = result["all_sat_names"]
 
         self.table.setDisabled(False)  # Re-enable UI
         print(f"Refreshed {len(self.satellites)} satellites. Found {len(self.events)} passes.")
         
         self.refresh_table()
         self.update_current_plot()
-        self.update_sat_list()
+        self.update_sat_list(result["catalog"])
         self.update_single_plot(None)
         self.update_map_plot()
 
+        # The store only serves the map, so it is built for what the map draws
+        ephemeris_worker = EphemerisWorker(self.ephemeris_store, self.map_satellites(), self.ts, self.config["hours"])
+        ephemeris_worker.signals.finished.connect(lambda result: self.update_map_plot())
+        ephemeris_worker.signals.error.connect(lambda message: print(f"Error building ephemeris store: {message}"))
+        self.thread_pool.start(ephemeris_worker)
+
         self.writeConfig()
 
     def on_refresh_data_error(self, error_message):
@@ -532,27 +2929,13 @@ class SatelliteApp(QMainWindow):
 
     def create_calendar_invite(self, event):
 
-        from datetime import datetime, timedelta
-
         cal = icalendar.Calendar()
         cal.add('prodid', '-//spaceboi//spaceboi//')
         cal.add('version', '2.0')
-
-        start_time = event['startTime'].astimezone(pytz.timezone(self.config['timezone']))
-        end_time = event['endTime'].astimezone(pytz.timezone(self.config['timezone']))
-
-        cal_event = icalendar.Event()
-        cal_event.add('summary', f"Pass for {event['satellite']}")
-        cal_event.add('dtstart', start_time)
-        cal_event.add('dtend', end_time)
-        cal_event.add('dtstamp', datetime.now())
-        cal_event.add('location', f"{self.config['lat']},{self.config['lon']}")
-        cal_event.add('description', formatPass(event, pytz.timezone(self.config['timezone'])))
-
-        cal.add_component(cal_event)
+        cal.add_component(buildCalendarEvent(event, self.config))
 
         os.makedirs('/tmp/spaceboi/calendar/', exist_ok=True)
-        cal_invite_path = f'/tmp/spaceboi/calendar/{event["satellite"]}_{event["startTime"].astimezone(pytz.timezone(self.config["timezone"])).strftime("%Y-%m-%d_%H-%M")}.ics'
+        cal_invite_path = f'/tmp/spaceboi/calendar/{event["satellite"]}_{event["startTime"].astimezone(localTimezone(self.config)).strftime("%Y-%m-%d_%H-%M")}.ics'
 
         with open(cal_invite_path, 'wb') as f:
             f.write(cal.to_ical())
@@ -560,6 +2943,10 @@ class SatelliteApp(QMainWindow):
         return cal_invite_path
 
 
+    def export_all_passes(self):
+        ics_path = os.path.expanduser(self.config.get("ics", DEFAULT_CONFIG["ics"]))
+        exportCalendar(self.events, self.config, ics_path)
+
     def handle_calendar_invite_click(self, event):
 
         cal_invite_path = self.create_calendar_invite(event)
@@ -578,7 +2965,7 @@ class SatelliteApp(QMainWindow):
         self.table.setSortingEnabled(False)
         #self.table.setRowCount(len(self.events))
 
-        timezone = pytz.timezone(self.config["timezone"])
+        timezone = localTimezone(self.config)
         now = datetime.now(timezone)
         abr_timezone = now.tzname()
 
@@ -591,10 +2978,16 @@ class SatelliteApp(QMainWindow):
 
         for i, event in enumerate(self.events):
             self.table.setItem(i, 0, QTableWidgetItem(event["satellite"]))
-            self.table.setItem(i, 1, QTableWidgetItem(str(event["startTime"].astimezone(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d %H:%M:%S'))))
-            self.table.setItem(i, 2, QTableWidgetItem(str(event["endTime"].astimezone(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d %H:%M:%S'))))
+            self.table.setItem(i, 1, QTableWidgetItem(str(event["startTime"].astimezone(timezone).strftime('%Y-%m-%d %H:%M:%S'))))
+            self.table.setItem(i, 2, QTableWidgetItem(str(event["endTime"].astimezone(timezone).strftime('%Y-%m-%d %H:%M:%S'))))
             self.table.setItem(i, 3, QTableWidgetItem(f"{event['maxAlt']:.0f}"))
 
+            # Highlight the passes the antenna schedule picked
+            if event.get("scheduled"):
+                for col in range(4):
+                    self.table.item(i, col).setBackground(QColor("#b7e1b0"))
+                    self.table.item(i, col).setForeground(QColor("black"))
+
         # Resize the time cols to fit the content
         self.table.resizeColumnsToContents()
         # Don't let the table be edited
@@ -617,7 +3010,7 @@ class SatelliteApp(QMainWindow):
     def get_event_at_position(self, position):
         row = self.table.rowAt(position.y())
         for event in self.events:
-            if event["satellite"] == self.table.item(row, 0).text() and event["startTime"].astimezone(pytz.timezone('US/Eastern')).strftime('%Y-%m-%d %H:%M:%S') == self.table.item(row, 1).text():
+            if event["satellite"] == self.table.item(row, 0).text() and event["startTime"].astimezone(localTimezone(self.config)).strftime('%Y-%m-%d %H:%M:%S') == self.table.item(row, 1).text():
                 return event
         return None
 
@@ -632,9 +3025,9 @@ class SatelliteApp(QMainWindow):
     
         if events:
             # Plot current passes
-            plot_events(self.satellites, events, self.ts, self.topo, self.ax)
+            plot_events(self.satellites, events, self.ts, self.topo, self.ax, local_tz=localTimezone(self.config))
             self.ax.title.set_text(
-                f"Current Passes - {self.ts.now().astimezone(pytz.timezone('US/Eastern')).strftime('%m/%d - %H:%M:%S')}"
+                f"Current Passes - {self.ts.now().astimezone(localTimezone(self.config)).strftime('%m/%d - %H:%M:%S')}"
             )
 
 
@@ -663,13 +3056,13 @@ class SatelliteApp(QMainWindow):
     
             if next_pass:
                 # Calculate time till next pass
-                time_till_next_pass = next_pass["startTime"].utc_datetime() -  datetime.now().astimezone(pytz.timezone('UTC'))
+                time_till_next_pass = next_pass["startTime"].utc_datetime() -  datetime.now(pytz.utc)
 
                 countdown_str = str(time_till_next_pass).split(".")[0]
 
                 next_pass_string = (
                     f"Next Pass {next_pass['satellite']}\n"
-                    f"{next_pass['startTime'].astimezone(pytz.timezone('US/Eastern')).strftime('%m/%d - %H:%M:%S')}\nT-{countdown_str}"
+                    f"{next_pass['startTime'].astimezone(localTimezone(self.config)).strftime('%m/%d - %H:%M:%S')}\nT-{countdown_str}"
                 )
 
                 self.ax.text(
@@ -697,7 +3090,13 @@ class SatelliteApp(QMainWindow):
     def update_single_plot(self, event):
 
         self.single_ax.clear()
+
+        if self.doppler_ax is not None:
+            self.doppler_ax.remove()
+            self.doppler_ax = None
+
         if not event:
+            self.single_canvas.draw_idle()
             return
 
         try:
@@ -706,8 +3105,13 @@ class SatelliteApp(QMainWindow):
             print(f"Satellite {event['satellite']} not found")
             return
 
-        plot_event(sat, event, self.ts, self.topo, ax=self.single_ax)
-        self.single_ax.title.set_text(f"{event['satellite']} Pass - {event['startTime'].astimezone(pytz.timezone(self.config['timezone'])).strftime('%m/%d - %H:%M:%S')}")
+        plot_event(sat, event, self.ts, self.topo, ax=self.single_ax, local_tz=localTimezone(self.config))
+
+        if any(key in event["segments"][0] for key in ("downlink", "uplink")):
+            self.doppler_ax = self.single_fig.add_axes([0.7, 0.06, 0.28, 0.2])
+            plot_doppler(event, localTimezone(self.config), ax=self.doppler_ax)
+
+        self.single_ax.title.set_text(f"{event['satellite']} Pass - {event['startTime'].astimezone(localTimezone(self.config)).strftime('%m/%d - %H:%M:%S')}")
         self.single_canvas.draw()
 
     def on_table_selection_changed(self):
@@ -721,7 +3125,7 @@ class SatelliteApp(QMainWindow):
             selected_event = None
 
             for event in self.events:
-                if event["satellite"] == name and event["startTime"].astimezone(pytz.timezone(self.config["timezone"])).strftime('%Y-%m-%d %H:%M:%S') == start_time:
+                if event["satellite"] == name and event["startTime"].astimezone(localTimezone(self.config)).strftime('%Y-%m-%d %H:%M:%S') == start_time:
                     self.selected_sat = event["satellite"]
                     self.update_single_plot(event)
                     self.update_map_plot()
@@ -752,13 +3156,11 @@ class SatelliteApp(QMainWindow):
 
         self.writeConfig()
 
-    def on_satellite_selection_changed(self, item):
-        if item.checkState() == Qt.Checked:
-            if item.text() not in self.config["satellites"]:
-                self.config["satellites"].append(item.text())
+    def on_satellite_selection_changed(self, name, checked):
+        if checked:
+            self.config["satellites"].append(name)
         else:
-            if item.text() in self.config["satellites"]:
-                self.config["satellites"].remove(item.text())
+            self.config["satellites"].remove(name)
 
         self.writeConfig()
         self.apply_satellite_filter()
@@ -772,19 +3174,29 @@ class SatelliteApp(QMainWindow):
 
     def apply_satellite_filter(self):
         if self.config["filter_enabled"]:
-            self.satellites = [sat for sat in self.satellites if sat.name in self.config["satellites"]]
+            self.satellites = [sat for sat in self.satellites if sat.name in self.sat_model.checked]
 
-    def update_sat_list(self):
-        
-        self.all_sat_names.sort()
-        self.sat_list_widget.blockSignals(True)  # Prevent triggering `itemChanged` during setup
-        self.sat_list_widget.clear()
-        for sat_name in self.all_sat_names:
-            item = QListWidgetItem(sat_name)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if sat_name in self.config["satellites"] else Qt.Unchecked)
-            self.sat_list_widget.addItem(item)
-        self.sat_list_widget.blockSignals(False)
+    def update_sat_list(self, catalog):
+        self.sat_model.setCatalog(catalog)
+
+        sources = sorted({source for _, _, source in catalog})
+        current = self.sat_source_combo.currentData()
+
+        self.sat_source_combo.blockSignals(True)
+        self.sat_source_combo.clear()
+        self.sat_source_combo.addItem("All sources", None)
+        for source in sources:
+            self.sat_source_combo.addItem(catalogSourceLabel(source), source)
+        self.sat_source_combo.setCurrentIndex(max(0, self.sat_source_combo.findData(current)))
+        self.sat_source_combo.blockSignals(False)
+
+        self.sat_proxy.setSource(self.sat_source_combo.currentData())
+
+    def on_sat_search_changed(self, text):
+        self.sat_search_timer.start()
+
+    def on_sat_source_changed(self, index):
+        self.sat_proxy.setSource(self.sat_source_combo.itemData(index))
 
     def update_latitude(self, text):
         try:
@@ -800,20 +3212,22 @@ class SatelliteApp(QMainWindow):
         except ValueError:
             pass
 
-    def update_map_plot(self):
-
-        sats = self.satellites
-
+    def map_satellites(self):
         if not self.config["filter_enabled"]:
             # Limit to 20 satellites for legibility
-            sats = sats[:20]
+            return self.satellites[:20]
+
+        return self.satellites
+
+    def update_map_plot(self):
+
+        sats = self.map_satellites()
 
-        plot_map(sats, self.ts, self.config, ax=self.ax_map, my_map=self.map, selected=self.selected_sat)
+        plot_map(sats, self.ts, self.config, ax=self.ax_map, my_map=self.map, selected=self.selected_sat, store=self.ephemeris_store)
         self.canvas_map.draw_idle()
 
     def writeConfig(self):
-        with open(self.config["config"], 'w') as f:
-            json.dump(self.config, f, indent=4)
+        self.config_writer.save()
 
 
 def initialize_map(ax):
@@ -823,7 +3237,7 @@ def initialize_map(ax):
     my_map.fillcontinents(color='gray',lake_color='aqua')
     return my_map
 
-def plot_map(satellites, ts, config, ax=None, my_map=None, selected=None):
+def plot_map(satellites, ts, config, ax=None, my_map=None, selected=None, store=None):
 
     if ax is None:
         fig = plt.figure(figsize(12, 8))
@@ -839,11 +3253,19 @@ def plot_map(satellites, ts, config, ax=None, my_map=None, selected=None):
 
     now = ts.now()
 
+    if store is not None:
+        store.load()
+
     for sat in satellites:
-        geocentric = sat.at(now)
-        subpoint = geocentric.subpoint()
-        lat = subpoint.latitude.degrees
-        lon = subpoint.longitude.degrees
+        xyz = store.at(sat, now) if store is not None else None
+
+        if xyz is not None:
+            lat, lon = itrfToLatLon(xyz[:, 0])
+        else:
+            geocentric = sat.at(now)
+            subpoint = geocentric.subpoint()
+            lat = subpoint.latitude.degrees
+            lon = subpoint.longitude.degrees
         x, y = my_map(lon, lat)
 
         color = "blue" 
@@ -879,7 +3301,7 @@ def fetchData(config, url):
 
     if os.path.exists(tle_file):
         # check if file is older than 1 day
-        if (time.time() - os.path.getmtime(tle_dir)) > 86400:
+        if (time.time() - os.path.getmtime(tle_file)) > 86400:
             # file is older than 1 day, refresh
             refresh = True
             
@@ -903,31 +3325,149 @@ def fetchData(config, url):
 
     return text_string
 
-def fetchAllData(config, ts):
-  all_sats = []
+def localCatalogPath(source):
+    """
+    Returns the filesystem path for a file:// url or an existing local path,
+    or None for remote sources.
+    """
+    if source.startswith("file://"):
+        return urllib.parse.unquote(urllib.parse.urlparse(source).path)
+
+    path = os.path.expanduser(source)
+    if "://" not in source and os.path.exists(path):
+        return path
+
+    return None
+
+def iterOmmJson(mm, chunk_size=1 << 20):
+    """
+    Incrementally decodes the objects of a JSON OMM array, reading the
+    memory-mapped file in chunks instead of loading the whole document.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,[':
+            pos += 1
+
+        if pos < len(buf) and buf[pos] == ']':
+            return
+
+        if pos < len(buf):
+            try:
+                obj, pos = decoder.raw_decode(buf, pos)
+                yield obj
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+
+        if eof:
+            return
+
+        data = mm.read(chunk_size)
+        eof = not data
+        buf = buf[pos:] + utf8.decode(data, final=eof)
+        pos = 0
+
+def iterOmmXml(mm):
+    """
+    Yields the OMM fields of each <segment> of an OMM XML document, clearing
+    parsed elements as it goes.
+    """
+    root = None
+
+    for event, elem in ET.iterparse(mm, events=('start', 'end')):
+        if root is None:
+            root = elem
+
+        if event != 'end' or elem.tag.rsplit('}', 1)[-1] != 'segment':
+            continue
 
-  for url in config["urls"]:
-    # Get the json data from the URL
+        fields = {}
+        for section in elem.iter():
+            if len(section) == 0 and section.text is not None:
+                fields[section.tag.rsplit('}', 1)[-1]] = section.text.strip()
 
-    text_string = fetchData(config, url)
-    json_sats = json.loads(text_string)
+        yield fields
 
+        # Drop every finished record from the tree, not just its contents
+        root.clear()
 
+def iterCatalog(path, ts):
+    """
+    Streams satellites out of a local catalog file. 2LE/3LE text, OMM JSON,
+    OMM CSV and OMM XML are detected from the file contents.
+    Parameters:
+        path (str): Path to the catalog file.
+        ts (Timescale): Skyfield timescale.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            head = mm[:4096].lstrip()
+            lines = iter(mm.readline, b'')
+
+            if head.startswith((b'[', b'{')):
+                records = iterOmmJson(mm)
+            elif head.startswith(b'<'):
+                records = iterOmmXml(mm)
+            elif b',' in head.split(b'\n', 1)[0] and b'NORAD_CAT_ID' in head.split(b'\n', 1)[0]:
+                records = csv.DictReader(line.decode('utf-8') for line in lines)
+            else:
+                for sat in parse_tle_file(lines, ts):
+                    if sat.name is None:
+                        sat.name = str(sat.model.satnum)
+                    yield sat
+                return
+
+            skipped = 0
+            for record in records:
+                try:
+                    yield EarthSatellite.from_omm(ts, record)
+                except (KeyError, ValueError, TypeError):
+                    skipped += 1
+
+            if skipped:
+                print(f"Skipped {skipped} malformed records in {path}")
+
+def fetchAllData(config, ts):
+  sats_by_name = {}
+
+  # Local catalogs replace the configured urls, so prediction can run offline
+  sources = config.get("catalog") or config["urls"]
 
-    for sat in json_sats:
-        # Check not already appended
-        # TODO Fix this
-        esat = EarthSatellite.from_omm(ts, sat)
+  for source in sources:
+    path = localCatalogPath(source)
+
+    if path is not None:
+        satellites = iterCatalog(path, ts)
+    else:
+        # Get the json data from the URL
+        text_string = fetchData(config, source)
+        satellites = (EarthSatellite.from_omm(ts, sat) for sat in json.loads(text_string))
 
-        # search for esat.name in satellites
-        if esat.name not in [sat.name for sat in all_sats]:
-          all_sats.append(EarthSatellite.from_omm(ts, sat))
+    for esat in satellites:
+        esat.source = source
+        existing = sats_by_name.get(esat.name)
 
+        # First source wins, but a newer element set of the same object
+        # (e.g. from a history dump) replaces the older one
+        if existing is None or (existing.model.satnum == esat.model.satnum and esat.epoch.tt > existing.epoch.tt):
+            sats_by_name[esat.name] = esat
 
+  all_sats = list(sats_by_name.values())
   filtered_sats = all_sats
 
   if config["filter_enabled"]:
-      filtered_sats = [sat for sat in all_sats if sat.name in config["satellites"]]
+      names = set(config["satellites"])
+      filtered_sats = [sat for sat in all_sats if sat.name in names]
 
   print(f"Found {len(all_sats)} satellites. Using {len(filtered_sats)}/{len(all_sats)}")
 
@@ -960,7 +3500,40 @@ DEFAULT_CONFIG  = {
     "hours": 36,
     "mode": "gui",
     "config": "~/.config/spaceboi/config.json",
-    "tle": "~/.local/share/spaceboi/TLE"
+    "tle": "~/.local/share/spaceboi/TLE",
+    "ics": "~/.local/share/spaceboi/spaceboi.ics",
+    "priorities": {},
+    "turnaround": 60,
+    "illumination": False,
+    "visible_only": False,
+    "frequencies": {
+        "FUNCUBE-1 (AO-73)": {"downlink": 145.935, "uplink": 435.140},
+        "FOX-1A (AO-85)": {"downlink": 145.980, "uplink": 435.170},
+        "FOX-1CLIFF (AO-95)": {"downlink": 145.920, "uplink": 435.300}
+    },
+    "chunk_hours": 24,
+    "forecast": "~/.local/share/spaceboi/forecast",
+    "rate": 10,
+    "refresh_minutes": 60,
+    "render_dir": "~/.local/share/spaceboi/plots",
+    "render_format": "png",
+    "horizon_mask": None,
+    "coverage": "~/.local/share/spaceboi/coverage.npz",
+    "coverage_metric": "passes",
+    "coverage_resolution": 1.0,
+    "notify_lead_minutes": 5,
+    "notify_events": ["pre_aos", "aos", "tca", "los"],
+    "notify_command": None,
+    "notify_webhook": None,
+    "notify_desktop": False,
+    "validate_tolerances": {
+        "aos": 1.0,     # seconds
+        "los": 1.0,     # seconds
+        "tca": 1.0,     # seconds
+        "max_alt": 0.1, # degrees
+        "missed": 0,
+        "extra": 0
+    }
 }
 
 def main(mode='gui'):
@@ -971,7 +3544,7 @@ def main(mode='gui'):
 
   parser = argparse.ArgumentParser(description='spaceboi')
 
-  parser.add_argument('--mode', type=str, choices=['gui', 'plot', 'cli'], default='gui', required=False, help='Mode to run the program in')
+  parser.add_argument('--mode', type=str, choices=['gui', 'plot', 'cli', 'ics', 'schedule', 'forecast', 'track', 'render', 'coverage', 'validate', 'notify'], default='gui', required=False, help='Mode to run the program in')
   parser.add_argument('--lat', type=float, required=False, help='Latitude of the observer')
   parser.add_argument('--lon', type=float, required=False, help='Longitude of the observer')
   parser.add_argument('--min_alt', type=int, required=False, help='Minimum altitude of the satellite')
@@ -981,6 +3554,28 @@ def main(mode='gui'):
   parser.add_argument('--timezone', type=str, required=False, help='Timezone of the observer')
   parser.add_argument('--config', type=str, required=False, help='Configuration file', default='~/.config/spaceboi/config.json')
   parser.add_argument('--tle', type=str, required=False, default="~/.local/share/spaceboi/TLE", help='TLE Cache directory')
+  parser.add_argument('--illumination', action='store_true', help='Annotate passes with sunlit/twilight state, downloads the de421 ephemeris on first use')
+  parser.add_argument('--visible_only', '--visible-only', action='store_true', help='Only keep passes where the satellite is sunlit and the observer is in darkness')
+  parser.add_argument('--turnaround', type=int, required=False, help='Seconds the antenna needs between two scheduled passes')
+  parser.add_argument('--chunk_hours', type=int, required=False, help='Hours per chunk in the forecast mode')
+  parser.add_argument('--forecast', type=str, required=False, help='Directory the forecast mode streams its results to')
+  parser.add_argument('--rotctld', type=str, required=False, help='host:port of a rotctld to drive in the track mode, positions are printed otherwise')
+  parser.add_argument('--rate', type=float, required=False, help='Updates per second in the track mode')
+  parser.add_argument('--render_dir', type=str, required=False, help='Directory the render mode writes pass plots to')
+  parser.add_argument('--render_format', type=str, required=False, help='Image format of the render mode, e.g. png or svg')
+  parser.add_argument('--contact_sheet', action='store_true', help='Render pages of pass plots instead of one file per pass')
+  parser.add_argument('--horizon_mask', type=str, required=False, help='CSV of azimuth,min elevation rows describing obstructions')
+  parser.add_argument('--coverage', type=str, required=False, help='Array file (.npz) the coverage mode writes, the map is rendered next to it')
+  parser.add_argument('--coverage_metric', type=str, choices=list(COVERAGE_METRICS), required=False, help='Statistic of the coverage mode')
+  parser.add_argument('--coverage_resolution', type=float, required=False, help='Grid spacing of the coverage mode in degrees')
+  parser.add_argument('--reference', type=str, choices=list(VALIDATION_ENGINES), default='search', help='Reference engine of the validate mode')
+  parser.add_argument('--candidate', type=str, choices=list(VALIDATION_ENGINES), default='calc', help='Engine checked against the reference in the validate mode')
+  parser.add_argument('--validate_catalog', type=str, choices=['synthetic', 'recorded', 'both'], default='both', help='Catalogs the validate mode runs over')
+  parser.add_argument('--notify_command', type=str, required=False, help='Shell command the notify mode runs per event, with SPACEBOI_* environment variables')
+  parser.add_argument('--notify_webhook', type=str, required=False, help='URL the notify mode POSTs events to as JSON')
+  parser.add_argument('--notify_desktop', action='store_true', help='Desktop notifications in the notify mode')
+  parser.add_argument('--catalog', type=str, nargs='+', required=False, help='Local TLE/3LE/OMM catalog files to use instead of the urls')
+  parser.add_argument('--ics', type=str, required=False, help='Calendar feed written by the ics mode')
 
   args = parser.parse_args()
   
@@ -1005,22 +3600,30 @@ def main(mode='gui'):
   config["tle"] = os.path.expanduser(args.tle)
 
   if args.mode == 'plot':
+    t = ts.now()
     topo = Topos(config["lat"], config["lon"])
     satellites, all_sats = fetchAllData(config, ts)
-    events = []
-    for sat in satellites:
-      events.extend(calcPasses(sat, t, config["hours"], topo, config["min_alt"]))
-
-    # Sort by time
-
-    events.sort(key=lambda x: x['startTime'])
+    events = cachedPasses(satellites, t, config, topo, ts)
 
     fig = plt.figure()
     ax = fig.add_subplot(111, polar=True)
-    plot_events(satellites, events, ts, my_topo, ax=ax)
+    plot_events(satellites, events, ts, topo, ax=ax, local_tz=localTimezone(config))
     plt.show()
     plt.close(fig)
 
+  elif args.mode == 'render':
+    t = ts.now()
+    topo = Topos(config["lat"], config["lon"])
+    satellites, all_sats = fetchAllData(config, ts)
+    events = cachedPasses(satellites, t, config, topo, ts)
+
+    renderPasses(
+        satellites, events, config,
+        os.path.expanduser(config.get("render_dir", DEFAULT_CONFIG["render_dir"])),
+        fmt=config.get("render_format", DEFAULT_CONFIG["render_format"]),
+        contactSheet=bool(config.get("contact_sheet"))
+    )
+
   elif args.mode == 'gui':
     app = QApplication(sys.argv)
     # Assuming satellites, events, ts, and my_topo are already initialized
@@ -1033,16 +3636,124 @@ def main(mode='gui'):
     t = ts.now()
     topo = Topos(config["lat"], config["lon"])
     satellites, all_sats = fetchAllData(config, ts)
-    events = []
-    for sat in satellites:
-      events.extend(calcPasses(sat, t, config["hours"], topo, config["min_alt"]))
+    events = cachedPasses(satellites, t, config, topo, ts)
 
-    # Sort by time
+    for event in events:
+        print(formatPass(event, localTimezone(config)))
 
-    events.sort(key=lambda x: x['startTime'])
+  elif args.mode == 'ics':
 
-    for event in events:
-        print(formatPass(event, pytz.timezone('US/Eastern')))
+    t = ts.now()
+    topo = Topos(config["lat"], config["lon"])
+    satellites, all_sats = fetchAllData(config, ts)
+    events = cachedPasses(satellites, t, config, topo, ts)
+
+    exportCalendar(events, config, os.path.expanduser(config.get("ics", DEFAULT_CONFIG["ics"])))
+
+  elif args.mode == 'schedule':
+
+    t = ts.now()
+    topo = Topos(config["lat"], config["lon"])
+    satellites, all_sats = fetchAllData(config, ts)
+    events = cachedPasses(satellites, t, config, topo, ts)
+
+    scheduled = schedulePasses(events, config)
+
+    print(formatSchedule(scheduled, localTimezone(config)))
+
+  elif args.mode == 'forecast':
+
+    t = ts.now()
+    satellites, all_sats = fetchAllData(config, ts)
+    store = os.path.expanduser(config.get("forecast", DEFAULT_CONFIG["forecast"]))
+
+    path, count = runForecast(satellites, t, config, store, chunkHours=config.get("chunk_hours", DEFAULT_CONFIG["chunk_hours"]))
+
+    print(f"Found {count} passes in {config['hours']} hours. Written to {path}")
+
+  elif args.mode == 'track':
+
+    t = ts.now()
+    topo = Topos(config["lat"], config["lon"])
+    satellites, all_sats = fetchAllData(config, ts)
+    events = cachedPasses(satellites, t, config, topo, ts)
+
+    sink = RotctldClient(config["rotctld"]) if config.get("rotctld") else StdoutTrackSink()
+
+    try:
+      trackPasses(satellites, events, topo, config, sink, rate=config.get("rate", DEFAULT_CONFIG["rate"]))
+    except KeyboardInterrupt:
+      pass
+    finally:
+      sink.close()
+
+  elif args.mode == 'coverage':
+
+    t = ts.now()
+    satellites, all_sats = fetchAllData(config, ts)
+    metric = config.get("coverage_metric", DEFAULT_CONFIG["coverage_metric"])
+    path = os.path.expanduser(config.get("coverage", DEFAULT_CONFIG["coverage"]))
+    fmt = config.get("render_format", DEFAULT_CONFIG["render_format"])
+
+    store = EphemerisStore(os.path.join(config["tle"], "ephemeris")).ensure(satellites, t, config["hours"])
+
+    lats, lons, values = coverageGrid(satellites, t, config, resolution=config.get("coverage_resolution", DEFAULT_CONFIG["coverage_resolution"]), metric=metric, store=store)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, lats=lats, lons=lons, values=values, metric=metric)
+    image = renderCoverage(lats, lons, values, metric, f"{os.path.splitext(path)[0]}.{fmt}", fmt)
+
+    print(f"Coverage of {len(satellites)} satellites over {values.size} grid points written to {path} and {image}")
+
+  elif args.mode == 'notify':
+
+    topo = Topos(config["lat"], config["lon"])
+    cache = PassCache(os.path.join(config["tle"], "passes.json"))
+    cache.load(ts)
+
+    def upcoming():
+      satellites, all_sats = fetchAllData(config, ts)
+      events, changed = cache.refresh(satellites, ts.now(), config, topo)
+      return events
+
+    notifier = PassNotifier(
+        notifyHooks(config),
+        lead=timedelta(minutes=config.get("notify_lead_minutes", DEFAULT_CONFIG["notify_lead_minutes"])),
+        kinds=config.get("notify_events", DEFAULT_CONFIG["notify_events"])
+    )
+
+    try:
+      notifier.run(upcoming, refreshSeconds=config.get("refresh_minutes", DEFAULT_CONFIG["refresh_minutes"]) * 60)
+    except KeyboardInterrupt:
+      notifier.stop()
+
+  elif args.mode == 'validate':
+
+    catalogs = []
+
+    if config["validate_catalog"] in ('synthetic', 'both'):
+      # Fixed epoch and window, so runs are comparable over time
+      epoch = ts.utc(2025, 1, 1)
+      catalogs.append(("Synthetic", syntheticCatalog(ts, epoch), epoch))
+
+    if config["validate_catalog"] in ('recorded', 'both'):
+      if config.get("catalog"):
+        # Stored catalog files, and a window starting at the hour of their
+        # newest element set, so the same files always give the same run
+        satellites, all_sats = fetchAllData(config, ts)
+        newest = max(sat.epoch.tt for sat in all_sats)
+        start = ts.tt_jd(newest).utc_datetime().replace(minute=0, second=0, microsecond=0)
+        catalogs.append(("Recorded", satellites, ts.from_datetime(start)))
+      elif config["validate_catalog"] == 'recorded':
+        print("The recorded catalog needs catalog files, pass them with --catalog")
+        sys.exit(2)
+      else:
+        print("No --catalog files given, skipping the recorded catalog")
+
+    rows, failures = validateEngines(catalogs, config, reference=config["reference"], candidate=config["candidate"], tolerances=config.get("validate_tolerances"))
+    print(formatValidation(rows, failures, config["reference"], config["candidate"]))
+
+    sys.exit(1 if failures else 0)
 
 if __name__ == "__main__":
     main()